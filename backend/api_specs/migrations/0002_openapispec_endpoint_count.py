@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:58
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_endpoint_count(apps, schema_editor):
+    OpenAPISpec = apps.get_model("api_specs", "OpenAPISpec")
+    for spec in OpenAPISpec.objects.annotate(n=Count("endpoints")).only("id"):
+        OpenAPISpec.objects.filter(pk=spec.pk).update(endpoint_count=spec.n)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api_specs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="openapispec",
+            name="endpoint_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_endpoint_count, migrations.RunPython.noop),
+    ]
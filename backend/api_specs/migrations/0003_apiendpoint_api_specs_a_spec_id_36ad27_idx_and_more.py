@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api_specs", "0002_openapispec_endpoint_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="apiendpoint",
+            index=models.Index(
+                fields=["spec", "method"], name="api_specs_a_spec_id_36ad27_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="openapispec",
+            index=models.Index(
+                fields=["created_by", "is_active", "-created_at"],
+                name="api_specs_o_created_6f8ca3_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,27 @@
-from django.db import models
-from django.contrib.auth.models import User
+import io
 import json
+import yaml
+from django.db import models, transaction
+from django.contrib.auth.models import User
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    _JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    IJSON_AVAILABLE = False
+    _JSON_ERRORS = (json.JSONDecodeError,)
+
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader
 
 
 class OpenAPISpec(models.Model):
@@ -12,20 +33,78 @@ class OpenAPISpec(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    endpoint_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_by', 'is_active', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} v{self.version}"
 
-    @property
-    def endpoint_count(self):
-        paths = self.spec_content.get('paths', {})
-        count = 0
-        for path_methods in paths.values():
-            count += len([m for m in path_methods.keys() if m in ['get', 'post', 'put', 'delete', 'patch']])
-        return count
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        # Specs created outside the API (admin, shell) get their endpoints too
+        if adding:
+            self.sync_endpoints()
+
+    def sync_endpoints(self):
+        """Rebuild endpoint records and endpoint_count from spec_content"""
+        endpoints = self._build_endpoints()
+        with transaction.atomic():
+            self.endpoints.all().delete()
+            APIEndpoint.objects.bulk_create(endpoints, batch_size=500)
+            self.endpoint_count = len(endpoints)
+            OpenAPISpec.objects.filter(pk=self.pk).update(endpoint_count=self.endpoint_count)
+        return endpoints
+
+    def _build_endpoints(self):
+        # Parse spec_content if it's a string
+        if isinstance(self.spec_content, str):
+            try:
+                # Try JSON first. With ijson only the `paths` subtree is
+                # built, not schemas/components that are never used here
+                if IJSON_AVAILABLE:
+                    paths = dict(ijson.kvitems(
+                        io.BytesIO(self.spec_content.encode()), 'paths', use_float=True
+                    ))
+                else:
+                    paths = _json_loads(self.spec_content).get('paths', {})
+            except _JSON_ERRORS:
+                try:
+                    # Try YAML
+                    spec_dict = yaml.load(self.spec_content, Loader=_YAMLLoader)
+                except yaml.YAMLError:
+                    # If both fail, skip endpoint creation
+                    return []
+                paths = spec_dict.get('paths', {})
+        else:
+            paths = self.spec_content.get('paths', {})
+
+        # Build unsaved rows for one batched insert. Methods differing only in
+        # case map to the same (path, method) row, so the first one wins
+        endpoints = {}
+        for path, methods in paths.items():
+            for method, details in methods.items():
+                if method.lower() in ['get', 'post', 'put', 'delete', 'patch'] \
+                        and (path, method.upper()) not in endpoints:
+                    endpoints[path, method.upper()] = APIEndpoint(
+                        spec=self,
+                        path=path,
+                        method=method.upper(),
+                        operation_id=details.get('operationId', ''),
+                        summary=details.get('summary', ''),
+                        description=details.get('description', ''),
+                        parameters=details.get('parameters', []),
+                        request_body=details.get('requestBody', {}),
+                        responses=details.get('responses', {}),
+                        tags=details.get('tags', [])
+                    )
+
+        return list(endpoints.values())
 
 
 class APIEndpoint(models.Model):
@@ -43,6 +122,9 @@ class APIEndpoint(models.Model):
     class Meta:
         unique_together = ['spec', 'path', 'method']
         ordering = ['path', 'method']
+        indexes = [
+            models.Index(fields=['spec', 'method']),
+        ]
 
     def __str__(self):
         return f"{self.method.upper()} {self.path}"
@@ -19,6 +19,17 @@ class OpenAPISpecSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class OpenAPISpecListSerializer(OpenAPISpecSerializer):
+    """List representation without the (potentially large) spec_content"""
+    
+    class Meta(OpenAPISpecSerializer.Meta):
+        fields = [
+            'id', 'name', 'description', 'version',
+            'created_by', 'created_at', 'updated_at', 'is_active',
+            'endpoint_count'
+        ]
+
+
 class APIEndpointSerializer(serializers.ModelSerializer):
     class Meta:
         model = APIEndpoint
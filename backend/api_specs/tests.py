@@ -1,3 +1,90 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from .models import OpenAPISpec
+
+
+def _spec(paths):
+    return {'openapi': '3.0.0', 'info': {'title': 'Pets', 'version': '1.0'}, 'paths': paths}
+
+
+class EndpointSyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('user', 'user@example.com', 'password')
+        self.client.force_login(self.user)
+
+    def test_create_dedupes_methods_differing_in_case(self):
+        content = _spec({
+            '/pets': {'get': {}, 'GET': {}, 'post': {}},
+            '/pets/{petId}': {'delete': {}, 'parameters': []},
+        })
+        response = self.client.post(
+            '/api/specs/', {'name': 'Pets', 'spec_content': content}, content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        spec = OpenAPISpec.objects.get(pk=response.json()['id'])
+        self.assertEqual(response.json()['endpoint_count'], 3)
+        self.assertEqual(spec.endpoint_count, spec.endpoints.count())
+
+    def test_update_recomputes_endpoints_when_content_changes(self):
+        spec = OpenAPISpec.objects.create(
+            name='Pets', spec_content=_spec({'/pets': {'get': {}}}), created_by=self.user
+        )
+        response = self.client.patch(
+            f'/api/specs/{spec.pk}/',
+            {'spec_content': _spec({'/pets': {'get': {}, 'post': {}}, '/owners': {'get': {}}})},
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['endpoint_count'], 3)
+        spec.refresh_from_db()
+        self.assertEqual(spec.endpoint_count, 3)
+        self.assertEqual(
+            sorted(spec.endpoints.values_list('path', 'method')),
+            [('/owners', 'GET'), ('/pets', 'GET'), ('/pets', 'POST')],
+        )
+
+    def test_spec_created_outside_the_api_gets_endpoints(self):
+        spec = OpenAPISpec.objects.create(
+            name='Pets', spec_content=_spec({'/pets': {'get': {}, 'put': {}}}), created_by=self.user
+        )
+
+        spec.refresh_from_db()
+        self.assertEqual(spec.endpoint_count, 2)
+        self.assertEqual(spec.endpoints.count(), 2)
+
+
+class SpecListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('user', 'user@example.com', 'password')
+        self.client.force_login(self.user)
+
+    def _names(self):
+        return [spec['name'] for spec in self.client.get('/api/specs/').json()['results']]
+
+    def test_writes_invalidate_cached_list(self):
+        self.assertEqual(self._names(), [])
+
+        response = self.client.post(
+            '/api/specs/', {'name': 'Pets', 'spec_content': _spec({})}, content_type='application/json'
+        )
+        self.assertEqual(self._names(), ['Pets'])
+
+        self.client.patch(
+            f"/api/specs/{response.json()['id']}/", {'name': 'Owners'}, content_type='application/json'
+        )
+        self.assertEqual(self._names(), ['Owners'])
+
+        self.client.delete(f"/api/specs/{response.json()['id']}/")
+        self.assertEqual(self._names(), [])
+
+    def test_list_is_served_from_cache(self):
+        self._names()
+        OpenAPISpec.objects.create(name='Pets', spec_content=_spec({}), created_by=self.user)
+
+        # Written outside the API, so the cached list is still returned
+        self.assertEqual(self._names(), [])
@@ -1,64 +1,74 @@
-import yaml
-import json
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 
-from .models import OpenAPISpec, APIEndpoint
-from .serializers import OpenAPISpecSerializer, APIEndpointSerializer
+from .models import OpenAPISpec
+from .serializers import OpenAPISpecSerializer, OpenAPISpecListSerializer, APIEndpointSerializer
 from training.models import SyntheticDataset
 from training.tasks_simple import generate_synthetic_dataset
 
+# Seconds a user's serialized spec list is served from cache
+SPEC_LIST_CACHE_TIMEOUT = 60
+
 
 class OpenAPISpecViewSet(viewsets.ModelViewSet):
     serializer_class = OpenAPISpecSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return OpenAPISpec.objects.filter(created_by=self.request.user)
+        queryset = OpenAPISpec.objects.filter(created_by=self.request.user)
+        if self.action == 'list':
+            # Skip loading spec_content for rows the list serializer won't show
+            queryset = queryset.only(*OpenAPISpecListSerializer.Meta.fields)
+        elif self.action == 'endpoints':
+            queryset = queryset.prefetch_related('endpoints')
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return OpenAPISpecListSerializer
+        return super().get_serializer_class()
+    
+    def list(self, request, *args, **kwargs):
+        cache_key = self._spec_list_cache_key()
+        data = cache.get(cache_key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(cache_key, data, SPEC_LIST_CACHE_TIMEOUT)
+        return Response(data)
+    
+    def _spec_list_cache_key(self):
+        # Keys carry a per-user generation so every cached page and filter of
+        # the list is dropped at once when the user's specs change
+        user_id = self.request.user.id
+        generation = cache.get(f'specs:{user_id}:generation', 0)
+        return f'specs:{user_id}:{generation}:{self.request.get_full_path()}'
+    
+    def _invalidate_spec_list(self):
+        key = f'specs:{self.request.user.id}:generation'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
     
     def perform_create(self, serializer):
-        spec = serializer.save(created_by=self.request.user)
-        
-        # Parse and create endpoint records
-        self._create_endpoints_from_spec(spec)
+        # Saving a new spec also creates its endpoint records
+        serializer.save(created_by=self.request.user)
+        self._invalidate_spec_list()
     
-    def _create_endpoints_from_spec(self, spec):
-        """Parse OpenAPI spec and create endpoint records"""
-        # Parse spec_content if it's a string
-        if isinstance(spec.spec_content, str):
-            try:
-                # Try JSON first
-                spec_dict = json.loads(spec.spec_content)
-            except json.JSONDecodeError:
-                try:
-                    # Try YAML
-                    spec_dict = yaml.safe_load(spec.spec_content)
-                except yaml.YAMLError:
-                    # If both fail, skip endpoint creation
-                    return
-        else:
-            spec_dict = spec.spec_content
-            
-        paths = spec_dict.get('paths', {})
-        
-        for path, methods in paths.items():
-            for method, details in methods.items():
-                if method.lower() in ['get', 'post', 'put', 'delete', 'patch']:
-                    APIEndpoint.objects.create(
-                        spec=spec,
-                        path=path,
-                        method=method.upper(),
-                        operation_id=details.get('operationId', ''),
-                        summary=details.get('summary', ''),
-                        description=details.get('description', ''),
-                        parameters=details.get('parameters', []),
-                        request_body=details.get('requestBody', {}),
-                        responses=details.get('responses', {}),
-                        tags=details.get('tags', [])
-                    )
+    def perform_update(self, serializer):
+        old_content = serializer.instance.spec_content
+        spec = serializer.save()
+        if spec.spec_content != old_content:
+            spec.sync_endpoints()
+        self._invalidate_spec_list()
+    
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        self._invalidate_spec_list()
     
     @action(detail=True, methods=['post'])
     def generate_dataset(self, request, pk=None):
@@ -94,6 +104,5 @@ class OpenAPISpecViewSet(viewsets.ModelViewSet):
     def endpoints(self, request, pk=None):
         """Get endpoints for this spec"""
         spec = self.get_object()
-        endpoints = APIEndpoint.objects.filter(spec=spec)
-        serializer = APIEndpointSerializer(endpoints, many=True)
+        serializer = APIEndpointSerializer(spec.endpoints.all(), many=True)
         return Response(serializer.data)
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        # login_view looks users up by email, which auth_user does not index
+        migrations.RunSQL(
+            sql="CREATE INDEX auth_user_email_idx ON auth_user (email);",
+            reverse_sql="DROP INDEX auth_user_email_idx;",
+        ),
+    ]
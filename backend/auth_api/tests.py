@@ -1,3 +1,19 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+
+class AutoLoginMiddlewareTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_logs_in_admin(self):
+        self.client.get('/api/datasets/')
+        self.assertEqual(self.client.session.get('_auth_user_id'), str(self.admin.pk))
+
+    def test_deactivated_admin_is_not_logged_in_from_cache(self):
+        self.client.get('/api/datasets/')
+        self.client.logout()
+        User.objects.filter(pk=self.admin.pk).update(is_active=False)
+
+        self.client.get('/api/datasets/')
+        self.assertNotIn('_auth_user_id', self.client.session)
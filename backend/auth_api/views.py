@@ -1,4 +1,4 @@
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import login, logout
 from django.contrib.auth.models import User
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
@@ -18,18 +18,20 @@ def login_view(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Try to find user by email
+    # Find user by email and check the password on that same row, rather
+    # than re-fetching it by username through authenticate()
     try:
-        user = User.objects.get(email=email)
-        username = user.username
+        user = User.objects.only(
+            'id', 'username', 'password', 'email', 'first_name', 'last_name', 'is_active'
+        ).get(email=email)
     except User.DoesNotExist:
         return Response(
             {'detail': 'The email or password provided is incorrect. Please check for typos and try logging in again.'}, 
             status=status.HTTP_401_UNAUTHORIZED
         )
     
-    # Authenticate with username and password
-    user = authenticate(request, username=username, password=password)
+    if not (user.is_active and user.check_password(password)):
+        user = None
     
     if user is not None:
         login(request, user)
@@ -1,13 +1,59 @@
 import json
+import multiprocessing
 import re
+import sys
 from typing import Dict, List, Any, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qs
 import difflib
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
-import jsonschema
-from openapi_spec_validator import validate_spec
+import numpy as np
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    from rapidfuzz.fuzz import ratio as _rapidfuzz_ratio
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    import sacrebleu
+    SACREBLEU_AVAILABLE = True
+except ImportError:
+    SACREBLEU_AVAILABLE = False
+
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Sentinel keys of APICallEvaluator's endpoint trie
+_TRIE_WILDCARD = '/*'
+_TRIE_METHODS = '/methods'
+
+# Below this many samples, process start-up costs more than it saves
+PARALLEL_EVALUATION_THRESHOLD = 1000
+
+
+@lru_cache(maxsize=8192)
+def _parse_api_call_cached(api_call_str: str) -> Dict[str, Any]:
+    # Greedy decoding repeats identical outputs, so successful parses are
+    # memoized. Callers must treat the returned dict as read-only.
+    # Try to parse as JSON
+    try:
+        return _json_loads(api_call_str.strip())
+    except json.JSONDecodeError:
+        # Try to extract JSON from text
+        json_match = _JSON_OBJECT_RE.search(api_call_str)
+        if json_match:
+            return _json_loads(json_match.group())
+        else:
+            raise ValueError("Could not parse API call as JSON")
 
 
 @dataclass
@@ -32,9 +78,11 @@ class EvaluationMetrics:
     json_validity: float
     semantic_similarity: float
     bleu_score: float
+    # Corpus-level BLEU from sacrebleu, when installed; not a per-sample metric
+    corpus_bleu: Optional[float] = None
     
     def to_dict(self) -> Dict[str, float]:
-        return {
+        metrics = {
             'exact_match': self.exact_match,
             'api_validity': self.api_validity,
             'method_accuracy': self.method_accuracy,
@@ -44,13 +92,23 @@ class EvaluationMetrics:
             'semantic_similarity': self.semantic_similarity,
             'bleu_score': self.bleu_score,
         }
+        if self.corpus_bleu is not None:
+            metrics['corpus_bleu'] = self.corpus_bleu
+        return metrics
+
+
+# Fixed column order for the per-sample metric matrix
+METRIC_NAMES = tuple(f.name for f in fields(EvaluationMetrics) if f.name != 'corpus_bleu')
 
 
 class APICallEvaluator:
     def __init__(self, openapi_spec: Dict[str, Any]):
         self.spec = openapi_spec
         self.base_url = self._extract_base_url()
-        self.valid_endpoints = self._extract_valid_endpoints()
+        self._endpoint_trie = self._build_endpoint_trie(self._extract_valid_endpoints())
+        # Only `servers` is read after construction, so don't keep the rest of
+        # a potentially large spec alive (or pickle it to pool workers)
+        self.spec = {'servers': self.spec.get('servers', [])}
         
     def _extract_base_url(self) -> str:
         servers = self.spec.get('servers', [])
@@ -65,10 +123,25 @@ class APICallEvaluator:
         for path, methods in paths.items():
             for method in methods.keys():
                 if method.lower() in ['get', 'post', 'put', 'delete', 'patch']:
-                    endpoints[path].append(method.upper())
+                    endpoints[path].append(sys.intern(method.upper()))
         
         return dict(endpoints)
     
+    def _build_endpoint_trie(self, valid_endpoints: Dict[str, List[str]]) -> Dict[str, Any]:
+        # Nested dicts keyed by path segment; every {param} segment shares the
+        # wildcard child. Sentinel keys contain '/' so no segment can clash.
+        trie = {}
+        
+        for path, methods in valid_endpoints.items():
+            node = trie
+            for part in path.strip('/').split('/'):
+                if part.startswith('{') and part.endswith('}'):
+                    part = _TRIE_WILDCARD
+                node = node.setdefault(part, {})
+            node.setdefault(_TRIE_METHODS, set()).update(methods)
+        
+        return trie
+    
     def evaluate_single_sample(self, 
                              input_text: str, 
                              expected_output: str, 
@@ -78,9 +151,15 @@ class APICallEvaluator:
         error_details = {}
         metrics = {}
         
+        # Strip and tokenize each output once; every metric below reuses these
+        expected_stripped = expected_output.strip()
+        predicted_stripped = predicted_output.strip()
+        expected_tokens = expected_stripped.split()
+        predicted_tokens = predicted_stripped.split()
+        
         # Parse expected and predicted API calls
         try:
-            expected_api = self._parse_api_call(expected_output)
+            expected_api = self._parse_api_call(expected_stripped)
             expected_valid = True
         except Exception as e:
             expected_api = None
@@ -88,7 +167,7 @@ class APICallEvaluator:
             error_details['expected_parse_error'] = str(e)
         
         try:
-            predicted_api = self._parse_api_call(predicted_output)
+            predicted_api = self._parse_api_call(predicted_stripped)
             predicted_valid = True
         except Exception as e:
             predicted_api = None
@@ -96,7 +175,7 @@ class APICallEvaluator:
             error_details['predicted_parse_error'] = str(e)
         
         # Calculate metrics
-        metrics['exact_match'] = float(expected_output.strip() == predicted_output.strip())
+        metrics['exact_match'] = float(expected_stripped == predicted_stripped)
         metrics['json_validity'] = float(predicted_valid)
         
         if expected_valid and predicted_valid:
@@ -115,9 +194,7 @@ class APICallEvaluator:
         )
         
         # Calculate BLEU score
-        metrics['bleu_score'] = self._calculate_bleu_score(
-            expected_output, predicted_output
-        )
+        metrics['bleu_score'] = self._bleu_from_tokens(expected_tokens, predicted_tokens)
         
         # Determine if correct (weighted combination of metrics)
         is_correct = self._determine_correctness(metrics)
@@ -138,38 +215,44 @@ class APICallEvaluator:
     
     def evaluate_dataset(self, 
                         test_samples: List[Dict[str, str]],
-                        predictions: List[str]) -> Tuple[List[EvaluationResult], EvaluationMetrics]:
+                        predictions: List[str],
+                        num_workers: int = 1) -> Tuple[List[EvaluationResult], EvaluationMetrics]:
         
         if len(test_samples) != len(predictions):
             raise ValueError("Number of test samples and predictions must match")
         
-        results = []
+        tasks = zip(range(len(test_samples)), test_samples, predictions)
         
-        for i, (sample, prediction) in enumerate(zip(test_samples, predictions)):
-            result = self.evaluate_single_sample(
-                input_text=sample['input'],
-                expected_output=sample['output'],
-                predicted_output=prediction,
-                sample_id=i
-            )
-            results.append(result)
+        # Samples are independent, so large runs can opt in to a process pool.
+        # Each worker receives this evaluator once via the pool initializer.
+        # Daemonic processes (e.g. Celery prefork children) cannot start one.
+        if (num_workers <= 1 or len(test_samples) < PARALLEL_EVALUATION_THRESHOLD
+                or multiprocessing.current_process().daemon):
+            results = [self._evaluate_task(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=num_workers,
+                initializer=_init_evaluation_worker,
+                initargs=(self,),
+            ) as executor:
+                results = list(executor.map(_evaluate_in_worker, tasks, chunksize=64))
         
         # Calculate aggregate metrics
         aggregate_metrics = self._calculate_aggregate_metrics(results)
         
         return results, aggregate_metrics
     
+    def _evaluate_task(self, task: Tuple[int, Dict[str, str], str]) -> EvaluationResult:
+        sample_id, sample, prediction = task
+        return self.evaluate_single_sample(
+            input_text=sample['input'],
+            expected_output=sample['output'],
+            predicted_output=prediction,
+            sample_id=sample_id
+        )
+    
     def _parse_api_call(self, api_call_str: str) -> Dict[str, Any]:
-        # Try to parse as JSON
-        try:
-            return json.loads(api_call_str.strip())
-        except json.JSONDecodeError:
-            # Try to extract JSON from text
-            json_match = re.search(r'\{.*\}', api_call_str, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                raise ValueError("Could not parse API call as JSON")
+        return _parse_api_call_cached(api_call_str)
     
     def _calculate_api_metrics(self, expected: Dict[str, Any], predicted: Dict[str, Any]) -> Dict[str, float]:
         metrics = {}
@@ -200,12 +283,14 @@ class APICallEvaluator:
         
         metrics['parameter_accuracy'] = (query_accuracy + body_accuracy) / 2
         
-        # API validity (check against OpenAPI spec)
-        metrics['api_validity'] = float(self._validate_against_spec(predicted))
+        # API validity (check against OpenAPI spec), reusing the parsed path
+        metrics['api_validity'] = float(self._endpoint_exists(predicted_method, predicted_path))
         
         return metrics
     
-    def _extract_path_from_url(self, url: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _extract_path_from_url(url: str) -> str:
         if not url:
             return ''
         
@@ -215,7 +300,9 @@ class APICallEvaluator:
         except:
             return url
     
-    def _calculate_path_similarity(self, expected: str, predicted: str) -> float:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _calculate_path_similarity(expected: str, predicted: str) -> float:
         if expected == predicted:
             return 1.0
         
@@ -265,42 +352,25 @@ class APICallEvaluator:
         try:
             method = api_call.get('method', '').upper()
             url = api_call.get('url', '')
-            path = self._extract_path_from_url(url)
-            
-            # Check if endpoint exists in spec
-            for spec_path, methods in self.valid_endpoints.items():
-                if self._path_matches_spec(path, spec_path) and method in methods:
-                    return True
-            
-            return False
+            return self._endpoint_exists(method, self._extract_path_from_url(url))
         except:
             return False
     
-    def _path_matches_spec(self, actual_path: str, spec_path: str) -> bool:
-        # Simple path matching with parameter substitution
-        actual_parts = actual_path.strip('/').split('/')
-        spec_parts = spec_path.strip('/').split('/')
-        
-        if len(actual_parts) != len(spec_parts):
-            return False
-        
-        for actual_part, spec_part in zip(actual_parts, spec_parts):
-            if spec_part.startswith('{') and spec_part.endswith('}'):
-                continue  # Parameter match
-            elif actual_part != spec_part:
-                return False
-        
-        return True
+    def _endpoint_exists(self, method: str, path: str) -> bool:
+        # Check if endpoint exists in spec
+        return _trie_has_endpoint(self._endpoint_trie, path.strip('/').split('/'), 0, method)
     
     def _calculate_semantic_similarity(self, expected: str, predicted: str) -> float:
         # Simple character-level similarity
+        if RAPIDFUZZ_AVAILABLE:
+            return _rapidfuzz_ratio(expected, predicted) / 100.0
         return difflib.SequenceMatcher(None, expected, predicted).ratio()
     
     def _calculate_bleu_score(self, expected: str, predicted: str) -> float:
+        return self._bleu_from_tokens(expected.split(), predicted.split())
+    
+    def _bleu_from_tokens(self, expected_tokens: List[str], predicted_tokens: List[str]) -> float:
         # Simplified BLEU score calculation
-        expected_tokens = expected.split()
-        predicted_tokens = predicted.split()
-        
         if not expected_tokens or not predicted_tokens:
             return 0.0
         
@@ -340,21 +410,50 @@ class APICallEvaluator:
         if not results:
             return EvaluationMetrics(0, 0, 0, 0, 0, 0, 0, 0)
         
-        # Calculate averages
-        metrics_sum = defaultdict(float)
-        for result in results:
-            for metric, value in result.metrics.items():
-                metrics_sum[metric] += value
-        
+        # Average every metric column in one reduction over an
+        # (n_samples, n_metrics) matrix
         n = len(results)
-        
-        return EvaluationMetrics(
-            exact_match=metrics_sum['exact_match'] / n,
-            api_validity=metrics_sum['api_validity'] / n,
-            method_accuracy=metrics_sum['method_accuracy'] / n,
-            path_accuracy=metrics_sum['path_accuracy'] / n,
-            parameter_accuracy=metrics_sum['parameter_accuracy'] / n,
-            json_validity=metrics_sum['json_validity'] / n,
-            semantic_similarity=metrics_sum['semantic_similarity'] / n,
-            bleu_score=metrics_sum['bleu_score'] / n,
-        )
\ No newline at end of file
+        matrix = np.fromiter(
+            (result.metrics.get(name, 0.0) for result in results for name in METRIC_NAMES),
+            dtype=np.float64,
+            count=n * len(METRIC_NAMES),
+        ).reshape(n, len(METRIC_NAMES))
+        
+        aggregate = EvaluationMetrics(*matrix.mean(axis=0).tolist())
+        
+        # bleu_score stays the mean of per-sample scores in every environment;
+        # corpus-level BLEU is reported alongside it when sacrebleu is available
+        if SACREBLEU_AVAILABLE:
+            aggregate.corpus_bleu = sacrebleu.corpus_bleu(
+                [result.predicted_output for result in results],
+                [[result.expected_output for result in results]],
+            ).score / 100.0
+        
+        return aggregate
+
+
+def _trie_has_endpoint(node: Dict[str, Any], parts: List[str], i: int, method: str) -> bool:
+    if i == len(parts):
+        return method in node.get(_TRIE_METHODS, ())
+    
+    # Prefer the literal segment, but fall back to a {param} sibling when the
+    # literal branch does not lead to a matching endpoint
+    child = node.get(parts[i])
+    if child is not None and _trie_has_endpoint(child, parts, i + 1, method):
+        return True
+    
+    child = node.get(_TRIE_WILDCARD)
+    return child is not None and _trie_has_endpoint(child, parts, i + 1, method)
+
+
+# Process pool state for APICallEvaluator.evaluate_dataset
+_worker_evaluator: Optional[APICallEvaluator] = None
+
+
+def _init_evaluation_worker(evaluator: APICallEvaluator) -> None:
+    global _worker_evaluator
+    _worker_evaluator = evaluator
+
+
+def _evaluate_in_worker(task: Tuple[int, Dict[str, str], str]) -> EvaluationResult:
+    return _worker_evaluator._evaluate_task(task)
\ No newline at end of file
@@ -1,3 +1,78 @@
-from django.test import TestCase
+import json
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from .harness import evaluator
+from .harness.evaluator import APICallEvaluator
+
+SPEC = {
+    'servers': [{'url': 'https://api.example.com'}],
+    'paths': {
+        '/pets': {'get': {}, 'post': {}},
+        '/pets/{petId}': {'get': {}, 'delete': {}},
+        '/pets/mine/toys': {'get': {}},
+        '/pets/{petId}/owner': {'get': {}},
+    },
+}
+
+
+def _call(method, path):
+    return json.dumps({'method': method, 'url': f'https://api.example.com{path}'})
+
+
+class EndpointTrieTests(SimpleTestCase):
+    def setUp(self):
+        self.evaluator = APICallEvaluator(SPEC)
+
+    def test_literal_and_parameter_paths(self):
+        self.assertTrue(self.evaluator._endpoint_exists('GET', '/pets'))
+        self.assertTrue(self.evaluator._endpoint_exists('DELETE', '/pets/42'))
+        self.assertFalse(self.evaluator._endpoint_exists('PUT', '/pets/42'))
+        self.assertFalse(self.evaluator._endpoint_exists('GET', '/owners'))
+
+    def test_falls_back_to_parameter_when_literal_branch_misses(self):
+        # "mine" matches the literal branch, but only {petId} has an owner
+        self.assertTrue(self.evaluator._endpoint_exists('GET', '/pets/mine/owner'))
+        self.assertTrue(self.evaluator._endpoint_exists('GET', '/pets/mine/toys'))
+        self.assertFalse(self.evaluator._endpoint_exists('GET', '/pets/42/toys'))
+
+
+class EvaluateDatasetTests(SimpleTestCase):
+    def setUp(self):
+        self.evaluator = APICallEvaluator(SPEC)
+        expected = [_call('GET', '/pets'), _call('DELETE', '/pets/1'), _call('POST', '/pets')] * 10
+        self.samples = [{'input': 'request', 'output': output} for output in expected]
+        self.predictions = [_call('GET', '/pets'), _call('GET', '/pets/1'), 'not json'] * 10
+
+    def test_parallel_results_match_serial(self):
+        with mock.patch.object(evaluator, 'PARALLEL_EVALUATION_THRESHOLD', 10):
+            serial, serial_metrics = self.evaluator.evaluate_dataset(self.samples, self.predictions)
+            parallel, parallel_metrics = self.evaluator.evaluate_dataset(
+                self.samples, self.predictions, num_workers=2
+            )
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel_metrics, serial_metrics)
+
+    def test_daemonic_process_evaluates_serially(self):
+        daemon = SimpleNamespace(daemon=True)
+        with mock.patch.object(evaluator, 'PARALLEL_EVALUATION_THRESHOLD', 10), \
+                mock.patch.object(evaluator.multiprocessing, 'current_process', return_value=daemon), \
+                mock.patch.object(evaluator, 'ProcessPoolExecutor') as pool:
+            results, _ = self.evaluator.evaluate_dataset(self.samples, self.predictions, num_workers=2)
+
+        pool.assert_not_called()
+        self.assertEqual(len(results), len(self.samples))
+
+    def test_bleu_score_is_sentence_mean_with_corpus_bleu_alongside(self):
+        corpus = mock.Mock()
+        corpus.corpus_bleu.return_value.score = 50.0
+        with mock.patch.object(evaluator, 'SACREBLEU_AVAILABLE', True), \
+                mock.patch.object(evaluator, 'sacrebleu', corpus, create=True):
+            results, metrics = self.evaluator.evaluate_dataset(self.samples, self.predictions)
+
+        mean_bleu = sum(r.metrics['bleu_score'] for r in results) / len(results)
+        self.assertAlmostEqual(metrics.bleu_score, mean_bleu)
+        self.assertEqual(metrics.to_dict()['corpus_bleu'], 0.5)
@@ -3,8 +3,11 @@ Model inference utilities for the playground
 """
 import json
 import os
+import re
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 
 try:
     from training.pipeline.smollm_trainer import SmolLMTrainer, TrainingConfig
@@ -14,178 +17,269 @@ except ImportError:
 
 from training.models import TrainedModel
 
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, separators=(',', ':'))
+
+# Seconds a looked-up TrainedModel is reused before hitting the database again
+MODEL_CACHE_TTL = 60
+# TrainedModel fields read while generating a response
+MODEL_FIELDS = ('id', 'name', 'base_model', 'is_active')
+# Number of distinct prompts whose mock output is kept in memory
+MOCK_CACHE_SIZE = 1024
+
+# Prompt patterns used by the mock generator, compiled once at import
+_LIMIT_RE = re.compile(r'limit (\d+)')
+_NAME_RE = re.compile(r'name (\w+)')
+_EMAIL_RE = re.compile(r'email (\S+@\S+)')
+_NAMED_RE = re.compile(r'named (\w+)')
+_SAYING_RE = re.compile(r'saying [\'"]?([^\'\"]+?)[\'"]?$')
+_SAYING_RE_FALLBACK = re.compile(r'saying (.+)')
+
+# Keyword groups the mock generator branches on, in priority order
+_POST_WORDS = ('create', 'add', 'new', 'post', 'submit')
+_PUT_WORDS = ('update', 'modify', 'change', 'put', 'patch')
+_DELETE_WORDS = ('delete', 'remove')
+_PET_TYPES = ('cat', 'dog', 'hamster', 'fish', 'bird')
+_STATUSES = ('active', 'pending', 'completed')
+_MOODS = ('happy', 'sleepy', 'playful', 'grumpy')
+_PROMPT_KEYWORDS = (
+    _POST_WORDS + _PUT_WORDS + _DELETE_WORDS + _PET_TYPES + _STATUSES + _MOODS
+    + ('compliment', 'pet', 'user', 'limit', 'status', 'name', 'email')
+)
+
+# A zero-width lookahead alternation reports every keyword occurrence, even
+# overlapping ones, so one scan matches the old per-word substring tests
+_KEYWORD_RE = re.compile(
+    '(?=(%s))' % '|'.join(sorted(_PROMPT_KEYWORDS, key=len, reverse=True))
+)
+
+# (keywords, value) rules checked in order; the first rule whose keywords
+# appear in the prompt wins
+_METHOD_RULES = (
+    (frozenset(_POST_WORDS), "POST"),
+    (frozenset(_PUT_WORDS), "PUT"),
+    (frozenset(_DELETE_WORDS), "DELETE"),
+)
+_COMPLIMENTS_URL = "https://api.petcompliments.com/v1/compliments"
+_DEFAULT_URL = "https://api.example.com/items"
+_URL_RULES = (
+    (frozenset(('compliment',)), _COMPLIMENTS_URL),
+    (frozenset(_PET_TYPES + ('pet',)), "https://api.example.com/pets"),
+    (frozenset(('user',)), "https://api.example.com/users"),
+)
+
+# Static part of the call returned when generation fails
+_ERROR_CALL = {"method": "GET", "url": "https://api.example.com/error"}
+
+# Prebuilt responses for calls without query parameters or a body, shared
+# by every prompt that resolves to them
+_BASE_URLS = tuple(url for _, url in _URL_RULES) + (_DEFAULT_URL,)
+_BARE_RESPONSES = {
+    (method, url): {"method": method, "url": url}
+    for method, urls in (
+        ("GET", _BASE_URLS[1:] + tuple(f"{_COMPLIMENTS_URL}/{pet}" for pet in _PET_TYPES)),
+        ("DELETE", _BASE_URLS),
+    )
+    for url in urls
+}
+
+
+def _first_keyword(keywords, candidates: Tuple[str, ...]) -> Optional[str]:
+    """Return the first candidate, in priority order, found in the prompt"""
+    for word in candidates:
+        if word in keywords:
+            return word
+    return None
+
+
+def _build_response_dict(prompt_lower: str) -> Dict[str, Any]:
+    """Generate a smarter mock response based on analysis of the lowercased prompt"""
+    # Find every known keyword in one pass over the prompt
+    keywords = {match.group(1) for match in _KEYWORD_RE.finditer(prompt_lower)}
+    pet_type = _first_keyword(keywords, _PET_TYPES)
+    
+    # Analyze prompt for HTTP method
+    for words, method in _METHOD_RULES:
+        if not keywords.isdisjoint(words):
+            break
+    else:
+        method = "GET"
+    
+    # Analyze prompt for endpoint
+    for words, url in _URL_RULES:
+        if not keywords.isdisjoint(words):
+            break
+    else:
+        url = _DEFAULT_URL
+    
+    if url == _COMPLIMENTS_URL and method == "GET":
+        # Extract pet type if mentioned
+        url += f"/{pet_type or 'cat'}"
+    
+    # Add parameters based on prompt
+    if method == "GET":
+        query_params = {}
+        if 'limit' in keywords:
+            # Try to extract number
+            limit_match = _LIMIT_RE.search(prompt_lower)
+            if limit_match:
+                query_params['limit'] = int(limit_match.group(1))
+            else:
+                query_params['limit'] = 10
+        
+        if 'status' in keywords:
+            status = _first_keyword(keywords, _STATUSES)
+            if status:
+                query_params['status'] = status
+        
+        # Check for mood words directly
+        mood = _first_keyword(keywords, _MOODS)
+        if mood:
+            query_params['mood'] = mood
+        
+        if not query_params:
+            return _BARE_RESPONSES[(method, url)]
+        
+        # Build query string
+        query_string = '&'.join([f"{k}={v}" for k, v in query_params.items()])
+        return {"method": method, "url": f"{url}?{query_string}"}
+    
+    elif method in ["POST", "PUT"]:
+        response = {"method": method, "url": url}
+        body = {}
+        if 'name' in keywords and 'compliment' not in keywords:
+            # Try to extract name (but not for compliment requests which have petName)
+            name_match = _NAME_RE.search(prompt_lower)
+            if name_match:
+                body['name'] = name_match.group(1)
+            else:
+                body['name'] = 'Fluffy'
+        
+        if 'email' in keywords:
+            email_match = _EMAIL_RE.search(prompt_lower)
+            if email_match:
+                body['email'] = email_match.group(1)
+        
+        if 'compliment' in keywords:
+            # Extract pet name if mentioned
+            name_match = _NAMED_RE.search(prompt_lower)
+            if name_match:
+                body['petName'] = name_match.group(1)
+            else:
+                body['petName'] = 'Fluffy'
+            
+            # Extract pet type
+            body['petType'] = pet_type or 'cat'
+            
+            # Extract custom compliment text - more flexible regex
+            saying_match = _SAYING_RE.search(prompt_lower)
+            if not saying_match:
+                # Try alternative patterns
+                saying_match = _SAYING_RE_FALLBACK.search(prompt_lower)
+            
+            if saying_match:
+                compliment_text = saying_match.group(1).strip('\'"')
+                body['customCompliment'] = compliment_text
+            else:
+                body['customCompliment'] = "You're an amazing pet!"
+        
+        if body:
+            response['body'] = body
+        return response
+    
+    return _BARE_RESPONSES[(method, url)]
+
+
+@lru_cache(maxsize=MOCK_CACHE_SIZE)
+def _smart_mock_impl(prompt_lower: str) -> Tuple[str, Dict[str, Any]]:
+    """Mock output for a lowercased prompt as (JSON text, parsed dict)
+
+    The mock only looks at the prompt, so results are shared across requests
+    and models; the returned dict must not be mutated.
+    """
+    response = _build_response_dict(prompt_lower)
+    return _json_dumps(response), response
+
 
 class ModelInference:
     """Handle model loading and inference for playground"""
     
     def __init__(self):
         self._loaded_models = {}  # Cache loaded models
+        self._trained_models = {}  # model_id -> (expires_at, TrainedModel)
     
-    def generate_api_call(self, model_id: int, prompt: str, spec_content: str = None) -> Dict[str, Any]:
+    def generate_api_call(self, model: Union[int, TrainedModel], prompt: str, spec_content: str = None) -> Dict[str, Any]:
         """Generate API call from natural language prompt"""
+        return self.generate_batch(model, [prompt], spec_content)[0]
+    
+    def generate_batch(self, model: Union[int, TrainedModel], prompts: List[str], spec_content: str = None) -> List[Dict[str, Any]]:
+        """Generate API calls for several prompts, loading the model record once"""
+        try:
+            # Get model info from database unless the caller already has it
+            trained_model = self._get_trained_model(model)
+        except Exception as e:
+            return [self._error_result(e) for _ in prompts]
+        
+        return [self._generate_for_model(trained_model, prompt, spec_content) for prompt in prompts]
+    
+    def _get_trained_model(self, model: Union[int, TrainedModel]) -> TrainedModel:
+        if isinstance(model, TrainedModel):
+            if not model.is_active:
+                raise TrainedModel.DoesNotExist("TrainedModel matching query does not exist.")
+            return model
+        
+        model_id = model
+        now = time.monotonic()
+        cached = self._trained_models.get(model_id)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        trained_model = TrainedModel.objects.only(*MODEL_FIELDS).get(id=model_id, is_active=True)
+        self._trained_models[model_id] = (now + MODEL_CACHE_TTL, trained_model)
+        return trained_model
+    
+    def _generate_for_model(self, trained_model, prompt: str, spec_content: str) -> Dict[str, Any]:
         try:
-            # Get model info from database
-            trained_model = TrainedModel.objects.get(id=model_id, is_active=True)
-            
             if ML_AVAILABLE:
                 # TODO: Implement actual model inference when ML libraries are available
                 # For now, generate a more intelligent mock response based on the prompt
-                response = self._generate_smart_mock(prompt, spec_content, trained_model)
+                response, parsed_response = self._generate_smart_mock(prompt, spec_content, trained_model)
             else:
                 # Generate smart mock response without ML libraries
-                response = self._generate_smart_mock(prompt, spec_content, trained_model)
-            
-            # Try to parse as JSON
-            try:
-                parsed_response = json.loads(response)
-                is_valid_json = True
-            except json.JSONDecodeError:
-                parsed_response = {"raw_output": response}
-                is_valid_json = False
+                response, parsed_response = self._generate_smart_mock(prompt, spec_content, trained_model)
             
             return {
                 "generated_output": response,
                 "parsed_api_call": parsed_response,
-                "is_valid_json": is_valid_json,
+                "is_valid_json": True,
                 "model_loaded": ML_AVAILABLE,
                 "model_name": trained_model.name,
                 "base_model": trained_model.base_model
             }
             
         except Exception as e:
-            # Fallback to basic mock response
-            return {
-                "generated_output": json.dumps({
-                    "method": "GET",
-                    "url": "https://api.example.com/error",
-                    "error": f"Failed to process request: {str(e)}"
-                }, indent=2),
-                "parsed_api_call": {
-                    "method": "GET", 
-                    "url": "https://api.example.com/error",
-                    "error": f"Failed to process request: {str(e)}"
-                },
-                "is_valid_json": True,
-                "model_loaded": False,
-                "error": str(e)
-            }
+            return self._error_result(e)
+    
+    def _error_result(self, e: Exception) -> Dict[str, Any]:
+        # Fallback to basic mock response
+        error_call = {**_ERROR_CALL, "error": f"Failed to process request: {str(e)}"}
+        return {
+            "generated_output": _json_dumps(error_call),
+            "parsed_api_call": error_call,
+            "is_valid_json": True,
+            "model_loaded": False,
+            "error": str(e)
+        }
     
-    def _generate_smart_mock(self, prompt: str, spec_content: str, trained_model) -> str:
+    def _generate_smart_mock(self, prompt: str, spec_content: str, trained_model) -> Tuple[str, Dict[str, Any]]:
         """Generate a smarter mock response based on prompt analysis"""
-        prompt_lower = prompt.lower()
-        
-        # Analyze prompt for HTTP method
-        if any(word in prompt_lower for word in ['create', 'add', 'new', 'post', 'submit']):
-            method = "POST"
-        elif any(word in prompt_lower for word in ['update', 'modify', 'change', 'put', 'patch']):
-            method = "PUT"
-        elif any(word in prompt_lower for word in ['delete', 'remove']):
-            method = "DELETE"
-        else:
-            method = "GET"
-        
-        # Analyze prompt for endpoint
-        if 'compliment' in prompt_lower:
-            url = "https://api.petcompliments.com/v1/compliments"
-            if method == "GET":
-                # Extract pet type if mentioned
-                for pet_type in ['cat', 'dog', 'hamster', 'fish', 'bird']:
-                    if pet_type in prompt_lower:
-                        url += f"/{pet_type}"
-                        break
-                else:
-                    url += "/cat"  # default
-        elif any(pet_type in prompt_lower for pet_type in ['cat', 'dog', 'hamster', 'fish', 'bird', 'pet']):
-            url = "https://api.example.com/pets"
-        elif 'user' in prompt_lower:
-            url = "https://api.example.com/users"
-        else:
-            url = "https://api.example.com/items"
-        
-        # Build response based on method
-        response = {"method": method, "url": url}
-        
-        # Add parameters based on prompt
-        if method == "GET":
-            query_params = {}
-            if 'limit' in prompt_lower:
-                # Try to extract number
-                import re
-                limit_match = re.search(r'limit (\d+)', prompt_lower)
-                if limit_match:
-                    query_params['limit'] = int(limit_match.group(1))
-                else:
-                    query_params['limit'] = 10
-            
-            if 'status' in prompt_lower:
-                if 'active' in prompt_lower:
-                    query_params['status'] = 'active'
-                elif 'pending' in prompt_lower:
-                    query_params['status'] = 'pending'
-                elif 'completed' in prompt_lower:
-                    query_params['status'] = 'completed'
-            
-            # Check for mood words directly
-            for mood in ['happy', 'sleepy', 'playful', 'grumpy']:
-                if mood in prompt_lower:
-                    query_params['mood'] = mood
-                    break
-            
-            if query_params:
-                # Build query string
-                query_string = '&'.join([f"{k}={v}" for k, v in query_params.items()])
-                response['url'] += f"?{query_string}"
-                
-        elif method in ["POST", "PUT"]:
-            body = {}
-            if 'name' in prompt_lower and 'compliment' not in prompt_lower:
-                # Try to extract name (but not for compliment requests which have petName)
-                import re
-                name_match = re.search(r'name (\w+)', prompt_lower)
-                if name_match:
-                    body['name'] = name_match.group(1)
-                else:
-                    body['name'] = 'Fluffy'
-            
-            if 'email' in prompt_lower:
-                import re
-                email_match = re.search(r'email (\S+@\S+)', prompt_lower)
-                if email_match:
-                    body['email'] = email_match.group(1)
-            
-            if 'compliment' in prompt_lower:
-                # Extract pet name if mentioned
-                import re
-                name_match = re.search(r'named (\w+)', prompt_lower)
-                if name_match:
-                    body['petName'] = name_match.group(1)
-                else:
-                    body['petName'] = 'Fluffy'
-                
-                # Extract pet type
-                for pet_type in ['cat', 'dog', 'hamster', 'fish', 'bird']:
-                    if pet_type in prompt_lower:
-                        body['petType'] = pet_type
-                        break
-                else:
-                    body['petType'] = 'cat'
-                
-                # Extract custom compliment text - more flexible regex
-                saying_match = re.search(r'saying [\'"]?([^\'\"]+?)[\'"]?$', prompt_lower)
-                if not saying_match:
-                    # Try alternative patterns
-                    saying_match = re.search(r'saying (.+)', prompt_lower)
-                
-                if saying_match:
-                    compliment_text = saying_match.group(1).strip('\'"')
-                    body['customCompliment'] = compliment_text
-                else:
-                    body['customCompliment'] = "You're an amazing pet!"
-            
-            if body:
-                response['body'] = body
-        
-        return json.dumps(response, indent=2)
+        return _smart_mock_impl(prompt.lower())
 
 
 # Global inference instance
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("playground", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="playgroundquery",
+            index=models.Index(
+                fields=["session", "-created_at"], name="playground__session_b639ed_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="playgroundsession",
+            index=models.Index(
+                fields=["created_by", "-updated_at"],
+                name="playground__created_1c5ff1_idx",
+            ),
+        ),
+    ]
@@ -15,6 +15,9 @@ class PlaygroundSession(models.Model):
 
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['created_by', '-updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.model.name})"
@@ -32,6 +35,9 @@ class PlaygroundQuery(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['session', '-created_at']),
+        ]
 
     def __str__(self):
         return f"Query {self.id} - {self.input_text[:50]}..."
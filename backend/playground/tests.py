@@ -1,3 +1,60 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from api_specs.models import OpenAPISpec
+from training.models import SyntheticDataset, TrainedModel, TrainingRun
+
+from .models import PlaygroundQuery
+
+API_CALL = {'method': 'GET', 'url': 'https://api.example.com/pets', 'query': {'limit': 10}}
+
+
+class GenerateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('user', 'user@example.com', 'password')
+        self.client.force_login(self.user)
+        self.spec = OpenAPISpec.objects.create(
+            name='Pets', spec_content={'paths': {'/pets': {'get': {}}}}, created_by=self.user
+        )
+        dataset = SyntheticDataset.objects.create(
+            name='Pets', spec=self.spec, num_samples=10, file_path='', created_by=self.user
+        )
+        run = TrainingRun.objects.create(
+            name='Pets', dataset=dataset, output_dir='', created_by=self.user
+        )
+        self.model = TrainedModel.objects.create(
+            name='Pets', training_run=run, model_path='', base_model='SmolLM2'
+        )
+        inference = mock.Mock()
+        inference.generate_api_call.return_value = {
+            'generated_output': '{"method":"GET"}',
+            'parsed_api_call': API_CALL,
+            'is_valid_json': True,
+        }
+        patcher = mock.patch('playground.views.get_inference', return_value=inference)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _generate(self, query=''):
+        return self.client.post(
+            f'/api/playground/generate/{query}',
+            {'model_id': self.model.id, 'spec_id': self.spec.id, 'input_text': 'list pets'},
+            content_type='application/json',
+        )
+
+    def test_response_carries_id_of_stored_query(self):
+        response = self._generate()
+
+        self.assertEqual(response.status_code, 200)
+        query = PlaygroundQuery.objects.get(pk=response.json()['id'])
+        self.assertEqual(query.input_text, 'list pets')
+        self.assertEqual(query.parsed_api_call, API_CALL)
+
+    def test_pretty_flag_is_parsed(self):
+        for query, pretty in [('', False), ('?pretty=0', False), ('?pretty=false', False),
+                              ('?pretty=1', True), ('?pretty=true', True), ('?pretty=yes', True)]:
+            with self.subTest(query=query):
+                output = self._generate(query).json()['generated_output']
+                self.assertEqual('\n' in output, pretty)
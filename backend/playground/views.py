@@ -7,9 +7,24 @@ import json
 
 from .models import PlaygroundSession, PlaygroundQuery
 from .serializers import PlaygroundSessionSerializer, PlaygroundQuerySerializer
+from .inference import MODEL_FIELDS, get_inference
 from training.models import TrainedModel
 from api_specs.models import OpenAPISpec
 
+try:
+    import orjson
+
+    def _json_dumps(obj, pretty: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode()
+except ImportError:
+    def _json_dumps(obj, pretty: bool = False) -> str:
+        if pretty:
+            return json.dumps(obj, indent=2)
+        return json.dumps(obj, separators=(',', ':'))
+
+# ?pretty= values that request indented generated_output
+PRETTY_VALUES = ('1', 'true', 'yes')
+
 
 class PlaygroundSessionViewSet(viewsets.ModelViewSet):
     serializer_class = PlaygroundSessionSerializer
@@ -26,7 +41,7 @@ class PlaygroundQueryViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return PlaygroundQuery.objects.filter(
             session__created_by=self.request.user
-        )
+        ).only(*PlaygroundQuerySerializer.Meta.fields)
     
     @action(detail=False, methods=['post'])
     def generate(self, request):
@@ -41,35 +56,43 @@ class PlaygroundQueryViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            model = TrainedModel.objects.get(id=model_id)
-            spec = OpenAPISpec.objects.get(id=spec_id)
-        except (TrainedModel.DoesNotExist, OpenAPISpec.DoesNotExist):
-            return Response(
-                {'error': 'Model or spec not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        # Reuse the user's session for this model and spec, fetching both with it
+        session = PlaygroundSession.objects.select_related('model', 'spec').filter(
+            model_id=model_id,
+            spec_id=spec_id,
+            created_by=request.user
+        ).first()
         
-        # Get or create session
-        session, created = PlaygroundSession.objects.get_or_create(
-            model=model,
-            spec=spec,
-            created_by=request.user,
-            defaults={'name': f'{model.name} + {spec.name}'}
-        )
+        if session is None:
+            try:
+                model = TrainedModel.objects.only(*MODEL_FIELDS).get(id=model_id)
+                spec = OpenAPISpec.objects.get(id=spec_id)
+            except (TrainedModel.DoesNotExist, OpenAPISpec.DoesNotExist):
+                return Response(
+                    {'error': 'Model or spec not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            session = PlaygroundSession.objects.create(
+                name=f'{model.name} + {spec.name}',
+                model=model,
+                spec=spec,
+                created_by=request.user
+            )
+        else:
+            model, spec = session.model, session.spec
         
         # Use actual model inference
         start_time = time.time()
         
         try:
-            from .inference import get_inference
             inference = get_inference()
             
             # Get spec content for context
             spec_content = spec.spec_content if hasattr(spec, 'spec_content') else None
             
             # Generate API call using the trained model
-            result = inference.generate_api_call(model_id, input_text, spec_content)
+            result = inference.generate_api_call(model, input_text, spec_content)
             
             generated_output = result['generated_output']
             parsed_api_call = result['parsed_api_call']
@@ -77,16 +100,19 @@ class PlaygroundQueryViewSet(viewsets.ModelViewSet):
             
         except Exception as e:
             # Fallback to basic mock if inference fails
-            generated_output = json.dumps({
+            parsed_api_call = {
                 "method": "GET",
                 "url": f"https://api.example.com/fallback",
                 "query": {"error": f"Inference failed: {str(e)}"}
-            }, indent=2)
-            parsed_api_call = json.loads(generated_output)
+            }
+            generated_output = _json_dumps(parsed_api_call)
             is_valid_api = True
         
         generation_time = int((time.time() - start_time) * 1000)
         
+        if request.query_params.get('pretty', '').lower() in PRETTY_VALUES:
+            generated_output = _json_dumps(parsed_api_call, pretty=True)
+        
         # Create query record
         query = PlaygroundQuery.objects.create(
             session=session,
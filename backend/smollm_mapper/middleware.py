@@ -1,6 +1,11 @@
+import time
+
 from django.contrib.auth import login
 from django.contrib.auth.models import User
 
+# Seconds the admin user's primary key is reused before searching for it again
+ADMIN_USER_CACHE_TTL = 60
+
 
 class AutoLoginMiddleware:
     """
@@ -8,16 +13,32 @@ class AutoLoginMiddleware:
     """
     def __init__(self, get_response):
         self.get_response = get_response
+        self._admin_user_pk = None
+        self._admin_user_expires = 0.0
 
     def __call__(self, request):
         # Auto-login as admin if not already authenticated
         if not request.user.is_authenticated:
             try:
-                admin_user = User.objects.filter(is_superuser=True).first()
+                admin_user = self._get_admin_user()
                 if admin_user:
                     login(request, admin_user)
             except Exception:
                 pass  # Silently fail if admin user doesn't exist
 
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
+
+    def _get_admin_user(self):
+        # Only the primary key is shared between requests; each request loads
+        # its own instance, so deactivation or a password change applies at once
+        admins = User.objects.filter(is_superuser=True, is_active=True)
+        now = time.monotonic()
+        if self._admin_user_pk is not None and now < self._admin_user_expires:
+            admin_user = admins.filter(pk=self._admin_user_pk).first()
+            if admin_user:
+                return admin_user
+        admin_user = admins.first()
+        self._admin_user_pk = admin_user.pk if admin_user else None
+        self._admin_user_expires = now + ADMIN_USER_CACHE_TTL
+        return admin_user
@@ -92,10 +92,33 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+# Shared through Redis so cache invalidation (e.g. the spec list) reaches every
+# process. Without REDIS_URL the cache is per-process, which is only correct
+# when a single process serves the API.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -148,7 +171,12 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'smollm_mapper.renderers.ORJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'smollm_mapper.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
@@ -173,16 +201,29 @@ CSRF_TRUSTED_ORIGINS = [
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
-CELERY_ACCEPT_CONTENT = ['json']
-CELERY_TASK_SERIALIZER = 'json'
-CELERY_RESULT_SERIALIZER = 'json'
+# msgpack gives smaller, faster task and result payloads; json is still accepted
+try:
+    import msgpack  # noqa: F401
+    _CELERY_SERIALIZER = 'msgpack'
+except ImportError:
+    _CELERY_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['msgpack', 'json'] if _CELERY_SERIALIZER == 'msgpack' else ['json']
+CELERY_TASK_SERIALIZER = _CELERY_SERIALIZER
+CELERY_RESULT_SERIALIZER = _CELERY_SERIALIZER
 CELERY_TIMEZONE = 'UTC'
+# Recycle a worker child once its resident memory passes this many KiB, so base
+# models cached by the trainer are released without restarting after every few tasks
+CELERY_WORKER_MAX_MEMORY_PER_CHILD = int(os.getenv('CELERY_WORKER_MAX_MEMORY_PER_CHILD', 8 * 1024 * 1024))
 
 # ML Settings
 MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', '../models')
 DATA_DIR = os.getenv('DATA_DIR', '../data')
 HUGGINGFACE_TOKEN = os.getenv('HUGGINGFACE_TOKEN', '')
 
+# When set (e.g. '/protected/datasets/'), dataset downloads are handed to nginx via
+# X-Accel-Redirect; the prefix must be an `internal;` location aliased to DATA_DIR
+DATASET_XACCEL_PREFIX = os.getenv('DATASET_XACCEL_PREFIX', '')
+
 # Training Configuration
 TRAINING_CONFIG = {
     'MAX_SEQ_LENGTH': int(os.getenv('MAX_SEQ_LENGTH', 2048)),
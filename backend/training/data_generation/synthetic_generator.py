@@ -1,10 +1,46 @@
+import gzip
 import json
+import multiprocessing
 import random
 import re
-from typing import Dict, List, Tuple, Any
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from functools import partial
+from typing import Dict, List, Tuple, Any, Callable, Hashable, Optional
 from dataclasses import dataclass
 from pathlib import Path
 
+try:
+    import orjson
+
+    def _json_dumps_bytes(obj, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+except ImportError:
+    def _json_dumps_bytes(obj, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(obj, indent=2).encode()
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+# Bytes of JSONL accumulated before each write in save_dataset_jsonl
+JSONL_WRITE_CHUNK_BYTES = 4 * 1024 * 1024
+
+# gzip level for save_dataset_jsonl_gz; low levels compress JSON well at little CPU cost
+JSONL_GZIP_LEVEL = 3
+
+# Number of parsed specs kept for reuse across generator instances
+PARSED_SPEC_CACHE_SIZE = 32
+
+# cache_key -> (base_url, endpoints), least recently used first
+_parsed_specs: "OrderedDict[Hashable, Tuple[str, List[Dict[str, Any]]]]" = OrderedDict()
+
+# Sample count from which generation is split across worker processes
+PARALLEL_GENERATION_THRESHOLD = 10_000
+
+# Matches a {param} placeholder in an endpoint path
+_PATH_PLACEHOLDER_RE = re.compile(r'\{([^{}]+)\}')
+
 
 @dataclass
 class APICall:
@@ -17,10 +53,11 @@ class APICall:
 
 
 class SyntheticDataGenerator:
-    def __init__(self, openapi_spec: Dict[str, Any]):
+    def __init__(self, openapi_spec: Dict[str, Any], cache_key: Optional[Hashable] = None,
+                 pretty: bool = False):
         self.spec = openapi_spec
-        self.base_url = self._extract_base_url()
-        self.endpoints = self._parse_endpoints()
+        self.pretty = pretty  # Indent generated API calls, for debugging
+        self.base_url, self.endpoints = self._load_parsed_spec(cache_key)
         
         # Templates for natural language requests
         self.request_templates = [
@@ -50,6 +87,31 @@ class SyntheticDataGenerator:
             'sort': ['name', 'date', 'price'],
             'order': ['asc', 'desc'],
         }
+        
+        # (param_name, type, format) -> zero-argument sample value generator
+        self._value_factories: Dict[Tuple[str, str, str], Callable[[], Any]] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Value factories may be lambdas, which can't be pickled for worker
+        # processes; workers rebuild them on first use
+        state = self.__dict__.copy()
+        state['_value_factories'] = {}
+        return state
+
+    def _load_parsed_spec(self, cache_key: Optional[Hashable]) -> Tuple[str, List[Dict[str, Any]]]:
+        # The key must change whenever the spec content does, e.g. (spec.id, spec.updated_at)
+        if cache_key is None:
+            return self._extract_base_url(), self._parse_endpoints()
+        
+        parsed = _parsed_specs.get(cache_key)
+        if parsed is None:
+            parsed = (self._extract_base_url(), self._parse_endpoints())
+            _parsed_specs[cache_key] = parsed
+            if len(_parsed_specs) > PARSED_SPEC_CACHE_SIZE:
+                _parsed_specs.popitem(last=False)
+        else:
+            _parsed_specs.move_to_end(cache_key)
+        return parsed
 
     def _extract_base_url(self) -> str:
         servers = self.spec.get('servers', [])
@@ -64,39 +126,88 @@ class SyntheticDataGenerator:
         for path, methods in paths.items():
             for method, details in methods.items():
                 if method.lower() in ['get', 'post', 'put', 'delete', 'patch']:
-                    endpoints.append({
+                    parameters = details.get('parameters', [])
+                    tags = details.get('tags', [])
+                    request_body = details.get('requestBody', {})
+                    endpoint = {
                         'path': path,
                         'method': method.upper(),
                         'details': details,
-                        'parameters': details.get('parameters', []),
-                        'requestBody': details.get('requestBody', {}),
+                        'parameters': parameters,
+                        'requestBody': request_body,
                         'summary': details.get('summary', ''),
-                        'tags': details.get('tags', []),
-                    })
+                        'tags': tags,
+                        # Derived once here instead of on every sample
+                        'resource': self._extract_resource_name(path, tags),
+                        'path_params': [p for p in parameters if p.get('in') == 'path'],
+                        'query_params': [p for p in parameters if p.get('in') == 'query'],
+                        'body_plan': self._compile_body_plan(request_body) if request_body else None,
+                        'info': {
+                            'path': path,
+                            'method': method.upper(),
+                            'summary': details.get('summary', ''),
+                        },
+                    }
+                    endpoint['path_format'], endpoint['path_fill_params'] = self._compile_path_format(
+                        path, endpoint['path_params']
+                    )
+                    endpoint['field_desc'] = self._generate_field_description(endpoint)
+                    endpoint['nl_text'], endpoint['nl_param'] = self._compile_natural_language_request(endpoint)
+                    endpoints.append(endpoint)
         
         return endpoints
 
-    def generate_synthetic_data(self, num_samples: int) -> List[Dict[str, str]]:
+    def generate_synthetic_data(self, num_samples: int, num_workers: int = 1) -> List[Dict[str, str]]:
+        if num_samples > 0 and not self.endpoints:
+            raise ValueError("OpenAPI spec has no endpoints to generate samples from")
+        
+        # Daemonic processes (e.g. Celery prefork children) cannot start a pool
+        if (num_workers <= 1 or num_samples < PARALLEL_GENERATION_THRESHOLD
+                or multiprocessing.current_process().daemon):
+            return self._generate_samples(num_samples)
+        
+        # Split samples evenly across workers, each with its own seed
+        chunk_sizes = [
+            num_samples // num_workers + (i < num_samples % num_workers)
+            for i in range(num_workers)
+        ]
+        seeds = [random.getrandbits(64) for _ in chunk_sizes]
+        
         samples = []
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_generation_worker,
+            initargs=(self,),
+        ) as executor:
+            for chunk in executor.map(_generate_in_worker, chunk_sizes, seeds):
+                samples.extend(chunk)
         
-        for _ in range(num_samples):
-            endpoint = random.choice(self.endpoints)
+        return samples
+
+    def _generate_samples(self, num_samples: int) -> List[Dict[str, str]]:
+        samples = []
+        
+        # Draw every sample's endpoint and query-parameter coin flips up front;
+        # seeding from `random` keeps runs reproducible under random.seed()
+        rng = np.random.default_rng(random.getrandbits(64))
+        endpoint_indices = rng.integers(0, max(len(self.endpoints), 1), size=num_samples).tolist()
+        max_query_params = max((len(e['query_params']) for e in self.endpoints), default=0)
+        include_query = (rng.random((num_samples, max_query_params)) < 0.3).tolist()  # 30% chance
+        
+        for endpoint_index, query_flags in zip(endpoint_indices, include_query):
+            endpoint = self.endpoints[endpoint_index]
             
             # Generate natural language request
             nl_request = self._generate_natural_language_request(endpoint)
             
             # Generate corresponding API call
-            api_call = self._generate_api_call(endpoint)
+            api_call = self._generate_api_call(endpoint, query_flags)
             
             # Format as training sample
             sample = {
                 'input': nl_request,
                 'output': self._format_api_call(api_call),
-                'endpoint_info': {
-                    'path': endpoint['path'],
-                    'method': endpoint['method'],
-                    'summary': endpoint['summary'],
-                }
+                'endpoint_info': endpoint['info'],  # Shared by all samples of this endpoint
             }
             
             samples.append(sample)
@@ -104,37 +215,45 @@ class SyntheticDataGenerator:
         return samples
 
     def _generate_natural_language_request(self, endpoint: Dict[str, Any]) -> str:
+        param = endpoint['nl_param']
+        if param is None:
+            return endpoint['nl_text']
+        
+        param_name = param['name']
+        sample_value = self._get_sample_value(param_name, param.get('schema', {}))
+        return f"{endpoint['nl_text']}{param_name} {sample_value}"
+
+    def _compile_natural_language_request(self, endpoint: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        # Returns the fixed request text and, when the request ends with a
+        # sampled path parameter, the parameter to append to it per sample
         method = endpoint['method'].lower()
         path = endpoint['path']
         summary = endpoint['summary']
-        tags = endpoint.get('tags', [])
-        
-        # Extract resource name from path or tags
-        resource = self._extract_resource_name(path, tags)
+        resource = endpoint['resource']
         
         # Generate based on HTTP method
         if method == 'get':
             if '{id}' in path or '{' in path:
-                return f"Get {resource} details for {self._generate_param_description(endpoint)}"
+                return self._compile_param_description(f"Get {resource} details for ", endpoint)
             else:
-                return f"List all {resource}"
+                return f"List all {resource}", None
         
         elif method == 'post':
-            fields = self._generate_field_description(endpoint)
-            return f"Create a new {resource} with {fields}"
+            fields = endpoint['field_desc']
+            return f"Create a new {resource} with {fields}", None
         
         elif method == 'put' or method == 'patch':
-            fields = self._generate_field_description(endpoint)
-            return f"Update {resource} with {fields}"
+            fields = endpoint['field_desc']
+            return f"Update {resource} with {fields}", None
         
         elif method == 'delete':
-            return f"Delete {resource} {self._generate_param_description(endpoint)}"
+            return self._compile_param_description(f"Delete {resource} ", endpoint)
         
         # Fallback to summary if available
         if summary:
-            return summary
+            return summary, None
         
-        return f"{method.title()} {resource}"
+        return f"{method.title()} {resource}", None
 
     def _extract_resource_name(self, path: str, tags: List[str]) -> str:
         if tags:
@@ -147,17 +266,13 @@ class SyntheticDataGenerator:
         
         return 'resource'
 
-    def _generate_param_description(self, endpoint: Dict[str, Any]) -> str:
-        parameters = endpoint.get('parameters', [])
-        path_params = [p for p in parameters if p.get('in') == 'path']
+    def _compile_param_description(self, prefix: str, endpoint: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        path_params = endpoint['path_params']
         
         if path_params:
-            param = path_params[0]
-            param_name = param['name']
-            sample_value = self._get_sample_value(param_name, param.get('schema', {}))
-            return f"{param_name} {sample_value}"
+            return prefix, path_params[0]
         
-        return "ID 123"
+        return f"{prefix}ID 123", None
 
     def _generate_field_description(self, endpoint: Dict[str, Any]) -> str:
         request_body = endpoint.get('requestBody', {})
@@ -170,40 +285,37 @@ class SyntheticDataGenerator:
         
         properties = schema.get('properties', {})
         if properties:
-            fields = list(properties.keys())[:3]  # Take first 3 fields
+            fields = islice(properties, 3)  # Take first 3 fields
             return ', '.join(fields)
         
         return "the required fields"
 
-    def _generate_api_call(self, endpoint: Dict[str, Any]) -> APICall:
+    def _generate_api_call(self, endpoint: Dict[str, Any], query_flags: Optional[List[bool]] = None) -> APICall:
         method = endpoint['method']
         path = endpoint['path']
         
-        # Generate path parameters
-        filled_path = path
-        path_params = {}
-        parameters = endpoint.get('parameters', [])
-        
-        for param in parameters:
-            if param.get('in') == 'path':
-                param_name = param['name']
-                sample_value = self._get_sample_value(param_name, param.get('schema', {}))
-                filled_path = filled_path.replace(f'{{{param_name}}}', str(sample_value))
-                path_params[param_name] = sample_value
+        # Fill the path parameters into the precompiled template in one format call
+        filled_path = endpoint['path_format'].format(*[
+            self._get_sample_value(param['name'], param.get('schema', {}))
+            for param in endpoint['path_fill_params']
+        ])
         
         # Generate query parameters
+        if query_flags is None:
+            query_flags = [random.random() < 0.3 for _ in endpoint['query_params']]  # 30% chance
+        
         query_params = {}
-        for param in parameters:
-            if param.get('in') == 'query' and random.random() < 0.3:  # 30% chance
+        for param, include in zip(endpoint['query_params'], query_flags):
+            if include:
                 param_name = param['name']
                 sample_value = self._get_sample_value(param_name, param.get('schema', {}))
                 query_params[param_name] = sample_value
         
         # Generate request body
         body = {}
-        request_body = endpoint.get('requestBody', {})
-        if request_body and method.upper() in ['POST', 'PUT', 'PATCH']:
-            body = self._generate_request_body(request_body)
+        body_plan = endpoint['body_plan']
+        if body_plan and method.upper() in ['POST', 'PUT', 'PATCH']:
+            body = self._generate_from_plan(body_plan)
         
         # Generate headers
         headers = {'Content-Type': 'application/json'}
@@ -220,58 +332,109 @@ class SyntheticDataGenerator:
     def _get_sample_value(self, param_name: str, schema: Dict[str, Any]) -> Any:
         param_type = schema.get('type', 'string')
         param_format = schema.get('format', '')
+        key = (param_name, str(param_type), str(param_format))
         
+        factory = self._value_factories.get(key)
+        if factory is None:
+            if param_type == 'array' and param_name.lower() not in self.sample_values:
+                # Depends on the items schema, which isn't part of the key
+                return [self._get_sample_value('item', schema.get('items', {}))]
+            
+            factory = self._build_value_factory(param_name, param_type, param_format)
+            self._value_factories[key] = factory
+        
+        return factory()
+
+    def _build_value_factory(self, param_name: str, param_type: Any, param_format: Any) -> Callable[[], Any]:
         # Check if we have predefined samples for this parameter name
         if param_name.lower() in self.sample_values:
-            return random.choice(self.sample_values[param_name.lower()])
+            return partial(random.choice, self.sample_values[param_name.lower()])
         
         # Generate based on type
         if param_type == 'integer':
-            return random.randint(1, 1000)
+            return partial(random.randint, 1, 1000)
         elif param_type == 'number':
-            return round(random.uniform(1.0, 100.0), 2)
+            return lambda: round(random.uniform(1.0, 100.0), 2)
         elif param_type == 'boolean':
-            return random.choice([True, False])
-        elif param_type == 'array':
-            return [self._get_sample_value('item', schema.get('items', {}))]
+            return partial(random.choice, (True, False))
         else:  # string
             if param_format == 'email':
-                return random.choice(self.sample_values['email'])
+                return partial(random.choice, self.sample_values['email'])
             elif param_format == 'date':
-                return '2024-01-15'
+                value = '2024-01-15'
             elif param_format == 'date-time':
-                return '2024-01-15T10:30:00Z'
+                value = '2024-01-15T10:30:00Z'
             else:
-                return f"sample_{param_name}"
+                value = f"sample_{param_name}"
+            return lambda: value
 
-    def _generate_request_body(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
+    def _compile_path_format(self, path: str, path_params: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        # Turn '/pets/{petId}' into '/pets/{0}' plus the parameter filling each slot.
+        # Placeholders without a declared parameter and any other braces stay literal.
+        declared = {}
+        for param in path_params:
+            declared.setdefault(param['name'], param)
+        
+        parts = []
+        slots = {}
+        pos = 0
+        for match in _PATH_PLACEHOLDER_RE.finditer(path):
+            parts.append(path[pos:match.start()].replace('{', '{{').replace('}', '}}'))
+            name = match.group(1)
+            if name in declared:
+                parts.append('{%d}' % slots.setdefault(name, len(slots)))
+            else:
+                parts.append('{{' + name + '}}')
+            pos = match.end()
+        parts.append(path[pos:].replace('{', '{{').replace('}', '}}'))
+        
+        return ''.join(parts), [declared[name] for name in slots]
+
+    def _compile_body_plan(self, request_body: Dict[str, Any]) -> Tuple[str, Any]:
         content = request_body.get('content', {})
         json_content = content.get('application/json', {})
         schema = json_content.get('schema', {})
         
-        return self._generate_object_from_schema(schema)
+        return self._compile_schema_plan(schema)
 
-    def _generate_object_from_schema(self, schema: Dict[str, Any]) -> Any:
+    def _compile_schema_plan(self, schema: Dict[str, Any]) -> Tuple[str, Any]:
+        # Flatten a JSON schema once into nested (kind, data) tuples so samples
+        # don't repeat the dict lookups:
+        #   ('object', [(prop_name, is_required, prop_plan), ...])
+        #   ('array', items_plan)
+        #   ('value', schema)
         schema_type = schema.get('type', 'object')
         
         if schema_type == 'object':
-            obj = {}
-            properties = schema.get('properties', {})
             required = schema.get('required', [])
-            
-            for prop_name, prop_schema in properties.items():
+            return ('object', [
+                (prop_name, prop_name in required, self._compile_schema_plan(prop_schema))
+                for prop_name, prop_schema in schema.get('properties', {}).items()
+            ])
+        
+        elif schema_type == 'array':
+            return ('array', self._compile_schema_plan(schema.get('items', {})))
+        
+        else:
+            return ('value', schema)
+
+    def _generate_from_plan(self, plan: Tuple[str, Any]) -> Any:
+        kind, data = plan
+        
+        if kind == 'object':
+            obj = {}
+            for prop_name, is_required, prop_plan in data:
                 # Include required fields and 50% of optional fields
-                if prop_name in required or random.random() < 0.5:
-                    obj[prop_name] = self._generate_object_from_schema(prop_schema)
+                if is_required or random.random() < 0.5:
+                    obj[prop_name] = self._generate_from_plan(prop_plan)
             
             return obj
         
-        elif schema_type == 'array':
-            items_schema = schema.get('items', {})
-            return [self._generate_object_from_schema(items_schema)]
+        elif kind == 'array':
+            return [self._generate_from_plan(data)]
         
         else:
-            return self._get_sample_value('field', schema)
+            return self._get_sample_value('field', data)
 
     def _format_api_call(self, api_call: APICall) -> str:
         result = {
@@ -288,17 +451,48 @@ class SyntheticDataGenerator:
         if api_call.headers and len(api_call.headers) > 1:  # More than just Content-Type
             result['headers'] = api_call.headers
         
-        return json.dumps(result, indent=2)
+        return _json_dumps_bytes(result, self.pretty).decode()
 
-    def save_dataset(self, samples: List[Dict[str, str]], output_path: str) -> None:
+    def save_dataset(self, samples: List[Dict[str, str]], output_path: str, pretty: bool = False) -> None:
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_path, 'w') as f:
-            json.dump(samples, f, indent=2)
+        # Compact by default; pretty=True indents the file for reading by hand
+        with open(output_path, 'wb') as f:
+            f.write(_json_dumps_bytes(samples, pretty))
 
     def save_dataset_jsonl(self, samples: List[Dict[str, str]], output_path: str) -> None:
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_path, 'w') as f:
-            for sample in samples:
-                f.write(json.dumps(sample) + '\n')
\ No newline at end of file
+        with open(output_path, 'wb', buffering=JSONL_WRITE_CHUNK_BYTES) as f:
+            _write_jsonl(f, samples)
+
+    def save_dataset_jsonl_gz(self, samples: List[Dict[str, str]], output_path: str) -> None:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        with gzip.open(output_path, 'wb', compresslevel=JSONL_GZIP_LEVEL) as f:
+            _write_jsonl(f, samples)
+
+
+def _write_jsonl(f, samples: List[Dict[str, str]]) -> None:
+    # Collect lines into large chunks so the file sees few, big writes
+    buf = bytearray()
+    for sample in samples:
+        buf += _json_dumps_bytes(sample)
+        buf += b'\n'
+        if len(buf) >= JSONL_WRITE_CHUNK_BYTES:
+            f.write(buf)
+            buf.clear()
+    f.write(buf)
+
+
+_worker_generator: Optional[SyntheticDataGenerator] = None
+
+
+def _init_generation_worker(generator: SyntheticDataGenerator) -> None:
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _generate_in_worker(num_samples: int, seed: int) -> List[Dict[str, str]]:
+    random.seed(seed)
+    return _worker_generator._generate_samples(num_samples)
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("training", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="syntheticdataset",
+            index=models.Index(
+                fields=["created_by", "status"], name="training_sy_created_115682_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="syntheticdataset",
+            index=models.Index(
+                fields=["created_by", "-created_at"],
+                name="training_sy_created_d42451_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trainingrun",
+            index=models.Index(
+                fields=["created_by", "status"], name="training_tr_created_1127f3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trainingrun",
+            index=models.Index(
+                fields=["created_by", "-created_at"],
+                name="training_tr_created_cabaf3_idx",
+            ),
+        ),
+    ]
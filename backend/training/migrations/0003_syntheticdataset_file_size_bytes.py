@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("training", "0002_syntheticdataset_training_sy_created_115682_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="syntheticdataset",
+            name="file_size_bytes",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("training", "0003_syntheticdataset_file_size_bytes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="syntheticdataset",
+            name="content_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -2,6 +2,12 @@ from django.db import models
 from django.contrib.auth.models import User
 from api_specs.models import OpenAPISpec
 
+# Rows per INSERT when creating trained model records in bulk
+TRAINED_MODEL_BATCH_SIZE = 500
+
+# Maps spaces to underscores when deriving a run's default output directory
+_OUTPUT_DIR_NAME_TABLE = str.maketrans(' ', '_')
+
 
 class SyntheticDataset(models.Model):
     name = models.CharField(max_length=200)
@@ -10,6 +16,8 @@ class SyntheticDataset(models.Model):
     num_samples = models.IntegerField()
     generation_config = models.JSONField(default=dict)
     file_path = models.CharField(max_length=500)
+    file_size_bytes = models.BigIntegerField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)  # sha256 of the file, used as its ETag
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=[
@@ -21,6 +29,10 @@ class SyntheticDataset(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_by', 'status']),
+            models.Index(fields=['created_by', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.num_samples} samples)"
@@ -48,10 +60,19 @@ class TrainingRun(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_by', 'status']),
+            models.Index(fields=['created_by', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.status}"
 
+    def save(self, *args, **kwargs):
+        if not self.output_dir:
+            self.output_dir = f"./models/{self.name.translate(_OUTPUT_DIR_NAME_TABLE).lower()}"
+        super().save(*args, **kwargs)
+
     @property
     def duration(self):
         if self.started_at and self.completed_at:
@@ -74,3 +95,11 @@ class TrainedModel(models.Model):
 
     def __str__(self):
         return f"{self.name} (from {self.training_run.name})"
+
+
+def create_trained_models(records):
+    """Insert TrainedModel rows from field dicts with multi-row INSERTs"""
+    return TrainedModel.objects.bulk_create(
+        [TrainedModel(**record) for record in records],
+        batch_size=TRAINED_MODEL_BATCH_SIZE,
+    )
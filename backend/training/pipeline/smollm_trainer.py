@@ -1,23 +1,45 @@
 import os
+import gzip
 import json
 import torch
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 
 from transformers import (
     AutoTokenizer,
     AutoModelForCausalLM,
+    BitsAndBytesConfig,
     TrainingArguments,
     Trainer,
     DataCollatorForLanguageModeling,
 )
 from datasets import Dataset
-from peft import LoraConfig, get_peft_model, TaskType
+from peft import LoraConfig, PeftModel, get_peft_model, TaskType
+from peft.utils import prepare_model_for_kbit_training as _peft_prepare_model_for_kbit_training
 from trl import SFTTrainer
 import bitsandbytes as bnb
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import flash_attn  # noqa: F401
+    ATTN_IMPLEMENTATION = "flash_attention_2"
+except ImportError:
+    ATTN_IMPLEMENTATION = "sdpa"
+
+# Base models kept loaded per worker process, keyed on model name and quantization settings
+BASE_MODEL_CACHE_SIZE = 2
+
+# Instruction line shared by training samples and inference prompts
+INSTRUCTION = "Convert the following natural language request to a REST API call:"
+
 
 @dataclass
 class TrainingConfig:
@@ -26,12 +48,21 @@ class TrainingConfig:
     batch_size: int = 4
     gradient_accumulation_steps: int = 4
     learning_rate: float = 2e-4
+    optim: str = "paged_adamw_8bit"
     num_epochs: int = 3
     warmup_steps: int = 100
     logging_steps: int = 10
     save_steps: int = 500
     eval_steps: int = 500
     
+    # Concatenate short samples into full max_seq_length rows
+    packing: bool = True
+    
+    # Compile the forward/backward graph with torch.compile (PyTorch 2.x). Off by
+    # default: compile time dominates short runs and it is fragile under 4-bit
+    # QLoRA with gradient checkpointing; enable with training_config["torch_compile"]
+    torch_compile: bool = False
+    
     # LoRA config
     lora_r: int = 16
     lora_alpha: int = 32
@@ -40,7 +71,7 @@ class TrainingConfig:
     
     # Quantization
     use_4bit: bool = True
-    bnb_4bit_compute_dtype: str = "float16"
+    bnb_4bit_compute_dtype: str = "auto"  # bfloat16 where the GPU supports it, else float16
     bnb_4bit_quant_type: str = "nf4"
     use_nested_quant: bool = False
     
@@ -59,44 +90,22 @@ class SmolLMTrainer:
         self.tokenizer = None
         self.model = None
         self.trainer = None
+        self.compute_dtype = _resolve_compute_dtype(config.bnb_4bit_compute_dtype)
         
     def setup_model_and_tokenizer(self):
-        # Load tokenizer
-        self.tokenizer = AutoTokenizer.from_pretrained(
+        # Reuse the tokenizer and base weights already loaded in this process
+        entry = _load_base(
             self.config.model_name,
-            trust_remote_code=True,
-            padding_side="right",
+            self.config.use_4bit,
+            self.config.bnb_4bit_quant_type,
+            self.compute_dtype,
+            self.config.use_nested_quant,
         )
+        self.tokenizer, base_model = entry
         
-        # Add pad token if it doesn't exist
-        if self.tokenizer.pad_token is None:
-            self.tokenizer.pad_token = self.tokenizer.eos_token
-            
-        # Quantization config
-        if self.config.use_4bit:
-            from transformers import BitsAndBytesConfig
-            
-            bnb_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_quant_type=self.config.bnb_4bit_quant_type,
-                bnb_4bit_compute_dtype=getattr(torch, self.config.bnb_4bit_compute_dtype),
-                bnb_4bit_use_double_quant=self.config.use_nested_quant,
-            )
-        else:
-            bnb_config = None
-            
-        # Load model
-        self.model = AutoModelForCausalLM.from_pretrained(
-            self.config.model_name,
-            quantization_config=bnb_config,
-            device_map="auto",
-            trust_remote_code=True,
-            torch_dtype=torch.float16,
-        )
-        
-        # Prepare model for k-bit training
-        if self.config.use_4bit:
-            self.model = prepare_model_for_kbit_training(self.model)
+        # A previous run left its LoRA layers injected into the cached base
+        if isinstance(base_model, PeftModel):
+            base_model = base_model.unload()
             
         # Setup LoRA
         peft_config = LoraConfig(
@@ -108,64 +117,45 @@ class SmolLMTrainer:
             target_modules=self.config.lora_target_modules,
         )
         
-        self.model = get_peft_model(self.model, peft_config)
+        self.model = get_peft_model(base_model, peft_config)
+        entry[1] = self.model
         self.model.print_trainable_parameters()
         
     def prepare_dataset(self, dataset_path: str) -> Dataset:
-        # Load dataset
-        with open(dataset_path, 'r') as f:
-            data = json.load(f)
-            
-        # Format for instruction tuning
-        formatted_data = []
-        for sample in data:
-            # Create instruction-following format
-            instruction = "Convert the following natural language request to a REST API call:"
-            input_text = sample['input']
-            output_text = sample['output']
-            
-            # Format as conversation
-            text = f"### Instruction:\n{instruction}\n\n### Input:\n{input_text}\n\n### Response:\n{output_text}"
-            
-            formatted_data.append({"text": text})
-            
-        return Dataset.from_list(formatted_data)
+        # Stream samples straight into Arrow storage instead of holding the whole file in memory.
+        # The cache fingerprint only covers gen_kwargs, so include the file's size and
+        # mtime; a dataset regenerated at the same path must not reuse stale Arrow data.
+        stat = os.stat(dataset_path)
+        return Dataset.from_generator(
+            _iter_formatted_samples,
+            gen_kwargs={"dataset_path": dataset_path, "file_stamp": (stat.st_size, stat.st_mtime_ns)},
+        )
     
     def tokenize_function(self, examples):
-        # Tokenize the text
-        tokenized = self.tokenizer(
-            examples["text"],
-            truncation=True,
-            padding=False,
-            max_length=self.config.max_seq_length,
-            return_overflowing_tokens=False,
+        return _tokenize_batch(examples, self.tokenizer, self.config.max_seq_length)
+    
+    def _tokenize_dataset(self, dataset: Dataset) -> Dataset:
+        # Labels are copied from input_ids by the collator, so only input_ids are built here
+        return dataset.map(
+            _tokenize_batch,
+            batched=True,
+            num_proc=os.cpu_count(),
+            fn_kwargs={"tokenizer": self.tokenizer, "max_length": self.config.max_seq_length},
+            remove_columns=dataset.column_names,
         )
-        
-        # Set labels for language modeling
-        tokenized["labels"] = tokenized["input_ids"].copy()
-        
-        return tokenized
     
     def train(self, dataset_path: str, eval_dataset_path: Optional[str] = None) -> Dict[str, Any]:
         # Setup model and tokenizer
         self.setup_model_and_tokenizer()
         
-        # Prepare datasets
+        # Prepare datasets; packed runs hand raw text to SFTTrainer, which tokenizes and packs it
         train_dataset = self.prepare_dataset(dataset_path)
-        train_dataset = train_dataset.map(
-            self.tokenize_function,
-            batched=True,
-            remove_columns=train_dataset.column_names,
-        )
+        eval_dataset = self.prepare_dataset(eval_dataset_path) if eval_dataset_path else None
         
-        eval_dataset = None
-        if eval_dataset_path:
-            eval_dataset = self.prepare_dataset(eval_dataset_path)
-            eval_dataset = eval_dataset.map(
-                self.tokenize_function,
-                batched=True,
-                remove_columns=eval_dataset.column_names,
-            )
+        if not self.config.packing:
+            train_dataset = self._tokenize_dataset(train_dataset)
+            if eval_dataset is not None:
+                eval_dataset = self._tokenize_dataset(eval_dataset)
         
         # Training arguments
         training_args = TrainingArguments(
@@ -175,6 +165,7 @@ class SmolLMTrainer:
             per_device_eval_batch_size=self.config.batch_size,
             gradient_accumulation_steps=self.config.gradient_accumulation_steps,
             learning_rate=self.config.learning_rate,
+            optim=self.config.optim,
             warmup_steps=self.config.warmup_steps,
             logging_steps=self.config.logging_steps,
             logging_dir=self.config.logging_dir,
@@ -188,15 +179,23 @@ class SmolLMTrainer:
             report_to=None,  # Disable wandb for now
             remove_unused_columns=False,
             dataloader_pin_memory=False,
-            fp16=True,
+            bf16=self.compute_dtype == torch.bfloat16,
+            fp16=self.compute_dtype == torch.float16,
             gradient_checkpointing=True,
+            torch_compile=self.config.torch_compile and hasattr(torch, "compile"),
         )
         
         # Data collator
-        data_collator = DataCollatorForLanguageModeling(
-            tokenizer=self.tokenizer,
-            mlm=False,
-        )
+        if self.config.packing:
+            trainer_kwargs = {"packing": True, "dataset_text_field": "text"}
+        else:
+            trainer_kwargs = {
+                "data_collator": DataCollatorForLanguageModeling(
+                    tokenizer=self.tokenizer,
+                    mlm=False,
+                    pad_to_multiple_of=8,
+                ),
+            }
         
         # Initialize trainer
         self.trainer = SFTTrainer(
@@ -204,9 +203,9 @@ class SmolLMTrainer:
             train_dataset=train_dataset,
             eval_dataset=eval_dataset,
             tokenizer=self.tokenizer,
-            data_collator=data_collator,
             args=training_args,
             max_seq_length=self.config.max_seq_length,
+            **trainer_kwargs,
         )
         
         # Start training
@@ -237,7 +236,7 @@ class SmolLMTrainer:
             raise ValueError("Model not loaded. Call setup_model_and_tokenizer() first.")
             
         # Format prompt
-        formatted_prompt = f"### Instruction:\nConvert the following natural language request to a REST API call:\n\n### Input:\n{prompt}\n\n### Response:\n"
+        formatted_prompt = f"### Instruction:\n{INSTRUCTION}\n\n### Input:\n{prompt}\n\n### Response:\n"
         
         # Tokenize
         inputs = self.tokenizer(
@@ -267,11 +266,97 @@ class SmolLMTrainer:
         return response
 
 
+@lru_cache(maxsize=BASE_MODEL_CACHE_SIZE)
+def _load_base(model_name: str, use_4bit: bool, quant_type: str,
+               compute_dtype: torch.dtype, use_nested_quant: bool) -> list:
+    """Load the tokenizer and k-bit-prepared base model as a mutable [tokenizer, model] entry"""
+    # Load tokenizer
+    tokenizer = AutoTokenizer.from_pretrained(
+        model_name,
+        trust_remote_code=True,
+        padding_side="right",
+        use_fast=True,
+    )
+    
+    # Add pad token if it doesn't exist
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+        
+    # Quantization config
+    if use_4bit:
+        bnb_config = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type=quant_type,
+            bnb_4bit_compute_dtype=compute_dtype,
+            bnb_4bit_use_double_quant=use_nested_quant,
+        )
+    else:
+        bnb_config = None
+        
+    # Load model with fused attention, falling back to SDPA where flash-attn can't run
+    model_kwargs = dict(
+        quantization_config=bnb_config,
+        device_map="auto",
+        trust_remote_code=True,
+        torch_dtype=compute_dtype,
+    )
+    try:
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            attn_implementation=ATTN_IMPLEMENTATION,
+            **model_kwargs,
+        )
+    except (ImportError, ValueError):
+        if ATTN_IMPLEMENTATION == "sdpa":
+            raise
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            attn_implementation="sdpa",
+            **model_kwargs,
+        )
+    
+    # Prepare model for k-bit training
+    if use_4bit:
+        model = prepare_model_for_kbit_training(model)
+        
+    return [tokenizer, model]
+
+
+def _resolve_compute_dtype(name: str) -> torch.dtype:
+    if name == "auto":
+        bf16 = torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+        return torch.bfloat16 if bf16 else torch.float16
+    return getattr(torch, name)
+
+
+def _iter_formatted_samples(dataset_path: str, file_stamp: Optional[Tuple[int, int]] = None):
+    """Yield instruction-tuning rows from a JSONL, gzipped JSONL or legacy JSON array dataset"""
+    # file_stamp is not read; it only feeds the datasets cache fingerprint
+    opener = gzip.open if dataset_path.endswith('.gz') else open
+    with opener(dataset_path, 'rb') as f:
+        if dataset_path.endswith(('.jsonl', '.jsonl.gz')):
+            samples = (_json_loads(line) for line in f if line.strip())
+        else:
+            samples = _json_loads(f.read())
+            
+        for sample in samples:
+            text = f"### Instruction:\n{INSTRUCTION}\n\n### Input:\n{sample['input']}\n\n### Response:\n{sample['output']}"
+            yield {"text": text}
+
+
+def _tokenize_batch(examples, tokenizer, max_length: int):
+    return tokenizer(
+        examples["text"],
+        truncation=True,
+        padding=False,
+        max_length=max_length,
+        return_overflowing_tokens=False,
+    )
+
+
 def prepare_model_for_kbit_training(model):
     """Prepare model for k-bit training"""
-    from peft.utils import prepare_model_for_kbit_training as prepare_model
-    
     model.gradient_checkpointing_enable()
-    model = prepare_model(model)
+    model = _peft_prepare_model_for_kbit_training(model)
     
     return model
\ No newline at end of file
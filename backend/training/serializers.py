@@ -17,6 +17,16 @@ class SyntheticDatasetSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class SyntheticDatasetListSerializer(SyntheticDatasetSerializer):
+    """List representation without the generation_config JSON"""
+    
+    class Meta(SyntheticDatasetSerializer.Meta):
+        fields = [
+            'id', 'name', 'spec', 'description', 'num_samples',
+            'file_path', 'created_by', 'created_at', 'status'
+        ]
+
+
 class TrainingRunSerializer(serializers.ModelSerializer):
     duration = serializers.ReadOnlyField()
     
@@ -40,6 +50,17 @@ class TrainingRunSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class TrainingRunListSerializer(TrainingRunSerializer):
+    """List representation without training_config and logs"""
+    
+    class Meta(TrainingRunSerializer.Meta):
+        fields = [
+            'id', 'name', 'dataset', 'model_name', 'output_dir',
+            'created_by', 'created_at', 'started_at', 'completed_at',
+            'status', 'metrics', 'duration'
+        ]
+
+
 class TrainedModelSerializer(serializers.ModelSerializer):
     class Meta:
         model = TrainedModel
@@ -1,16 +1,37 @@
 from celery import shared_task
 from django.conf import settings
+from django.utils import timezone
+import hashlib
 import json
 import os
 from pathlib import Path
-from datetime import datetime
 
-from .models import SyntheticDataset, TrainingRun, TrainedModel
+from .models import SyntheticDataset, TrainingRun, create_trained_models
 from .data_generation.synthetic_generator import SyntheticDataGenerator
 from .pipeline.smollm_trainer import SmolLMTrainer, TrainingConfig
 from api_specs.models import OpenAPISpec
 
 
+def _dir_size(path: str) -> int:
+    """Total size in bytes of the files under path, using the stat info scandir returns"""
+    total = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+            elif entry.is_dir(follow_symlinks=False):
+                total += _dir_size(entry.path)
+    return total
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 @shared_task(bind=True)
 def generate_synthetic_dataset(self, dataset_id: int):
     try:
@@ -21,8 +42,8 @@ def generate_synthetic_dataset(self, dataset_id: int):
         # Get the OpenAPI spec
         spec = dataset.spec
         
-        # Initialize generator
-        generator = SyntheticDataGenerator(spec.spec_content)
+        # Initialize generator, reusing the parsed endpoints while the spec is unchanged
+        generator = SyntheticDataGenerator(spec.spec_content, cache_key=(spec.id, spec.updated_at))
         
         # Generate samples
         samples = generator.generate_synthetic_data(dataset.num_samples)
@@ -31,11 +52,13 @@ def generate_synthetic_dataset(self, dataset_id: int):
         data_dir = Path(settings.DATA_DIR)
         data_dir.mkdir(parents=True, exist_ok=True)
         
-        output_path = data_dir / f"dataset_{dataset.id}.json"
-        generator.save_dataset(samples, str(output_path))
+        output_path = data_dir / f"dataset_{dataset.id}.jsonl.gz"
+        generator.save_dataset_jsonl_gz(samples, str(output_path))
         
         # Update dataset
         dataset.file_path = str(output_path)
+        dataset.file_size_bytes = output_path.stat().st_size
+        dataset.content_hash = _file_sha256(output_path)
         dataset.status = 'completed'
         dataset.save()
         
@@ -47,9 +70,7 @@ def generate_synthetic_dataset(self, dataset_id: int):
         }
         
     except Exception as e:
-        dataset = SyntheticDataset.objects.get(id=dataset_id)
-        dataset.status = 'failed'
-        dataset.save()
+        SyntheticDataset.objects.filter(pk=dataset_id).update(status='failed')
         
         return {
             'status': 'error',
@@ -63,7 +84,7 @@ def train_model(self, training_run_id: int):
     try:
         training_run = TrainingRun.objects.get(id=training_run_id)
         training_run.status = 'running'
-        training_run.started_at = datetime.now()
+        training_run.started_at = timezone.now()
         training_run.save()
         
         # Get dataset
@@ -86,27 +107,23 @@ def train_model(self, training_run_id: int):
         
         # Update training run
         training_run.status = 'completed'
-        training_run.completed_at = datetime.now()
+        training_run.completed_at = timezone.now()
         training_run.metrics = metrics
         training_run.save()
         
         # Create trained model record
         model_size = 0
         if os.path.exists(config.output_dir):
-            model_size = sum(
-                os.path.getsize(os.path.join(dirpath, filename))
-                for dirpath, dirnames, filenames in os.walk(config.output_dir)
-                for filename in filenames
-            ) / (1024 * 1024)  # Convert to MB
+            model_size = _dir_size(config.output_dir) / (1024 * 1024)  # Convert to MB
         
-        trained_model = TrainedModel.objects.create(
+        trained_model = create_trained_models([dict(
             name=f"{training_run.name}_model",
             training_run=training_run,
             model_path=config.output_dir,
             base_model=config.model_name,
             adapter_path=config.output_dir,
             model_size_mb=model_size
-        )
+        )])[0]
         
         return {
             'status': 'success',
@@ -116,11 +133,9 @@ def train_model(self, training_run_id: int):
         }
         
     except Exception as e:
-        training_run = TrainingRun.objects.get(id=training_run_id)
-        training_run.status = 'failed'
-        training_run.completed_at = datetime.now()
-        training_run.logs = str(e)
-        training_run.save()
+        TrainingRun.objects.filter(pk=training_run_id).update(
+            status='failed', completed_at=timezone.now(), logs=str(e)
+        )
         
         return {
             'status': 'error',
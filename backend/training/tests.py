@@ -1,3 +1,104 @@
-from django.test import TestCase
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from api_specs.models import OpenAPISpec
+
+from .data_generation import synthetic_generator
+from .data_generation.synthetic_generator import SyntheticDataGenerator
+from .models import SyntheticDataset
+
+SPEC = {
+    'openapi': '3.0.0',
+    'info': {'title': 'Pets', 'version': '1.0'},
+    'servers': [{'url': 'https://api.example.com'}],
+    'paths': {
+        '/pets': {
+            'get': {
+                'summary': 'List pets',
+                'parameters': [{'name': 'limit', 'in': 'query', 'schema': {'type': 'integer'}}],
+            },
+        },
+        '/pets/{petId}': {
+            'get': {
+                'summary': 'Get a pet',
+                'parameters': [{'name': 'petId', 'in': 'path', 'schema': {'type': 'string'}}],
+            },
+        },
+    },
+}
+
+
+class SyntheticGenerationTests(SimpleTestCase):
+    def test_parallel_output_matches_serial_shape(self):
+        generator = SyntheticDataGenerator(SPEC)
+        with mock.patch.object(synthetic_generator, 'PARALLEL_GENERATION_THRESHOLD', 10):
+            serial = generator.generate_synthetic_data(50)
+            parallel = generator.generate_synthetic_data(50, num_workers=2)
+
+        self.assertEqual(len(parallel), len(serial))
+        self.assertEqual({tuple(sorted(s)) for s in parallel}, {tuple(sorted(s)) for s in serial})
+        paths = {e['info']['path'] for e in generator.endpoints}
+        for sample in parallel:
+            self.assertIn(sample['endpoint_info']['path'], paths)
+
+    def test_daemonic_process_generates_serially(self):
+        generator = SyntheticDataGenerator(SPEC)
+        daemon = SimpleNamespace(daemon=True)
+        with mock.patch.object(synthetic_generator, 'PARALLEL_GENERATION_THRESHOLD', 10), \
+                mock.patch.object(synthetic_generator.multiprocessing, 'current_process', return_value=daemon), \
+                mock.patch.object(synthetic_generator, 'ProcessPoolExecutor') as pool:
+            samples = generator.generate_synthetic_data(50, num_workers=2)
+
+        pool.assert_not_called()
+        self.assertEqual(len(samples), 50)
+
+
+class DatasetDownloadTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('user', 'user@example.com', 'password')
+        self.client.force_login(user)
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'{"input":"list pets","output":"{}"}\n')
+        self.addCleanup(os.remove, path)
+        spec = OpenAPISpec.objects.create(name='Pets', spec_content=SPEC, created_by=user)
+        self.dataset = SyntheticDataset.objects.create(
+            name='Pets', spec=spec, num_samples=1, file_path=path, file_size_bytes=os.path.getsize(path),
+            content_hash='abc123', created_by=user, status='completed',
+        )
+        self.url = f'/api/datasets/{self.dataset.pk}/download/'
+
+    def test_download_sends_etag(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"abc123"')
+        self.assertIn('Cache-Control', response)
+        self.assertEqual(b''.join(response.streaming_content), b'{"input":"list pets","output":"{}"}\n')
+        response.close()
+
+    def test_matching_if_none_match_returns_not_modified(self):
+        for header in ['"abc123"', '"other", "abc123"', '*']:
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], '"abc123"')
+
+    def test_stale_if_none_match_downloads_file(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"')
+
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_dataset_without_hash_sends_no_etag(self):
+        SyntheticDataset.objects.filter(pk=self.dataset.pk).update(content_hash='')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        response.close()
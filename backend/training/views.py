@@ -1,21 +1,65 @@
 import os
-from django.http import HttpResponse, Http404
+from pathlib import Path
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, Http404
+from django.utils.http import content_disposition_header, parse_etags
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from .models import SyntheticDataset, TrainingRun, TrainedModel
-from .serializers import SyntheticDatasetSerializer, TrainingRunSerializer, TrainedModelSerializer
+from .serializers import (
+    SyntheticDatasetSerializer, SyntheticDatasetListSerializer,
+    TrainingRunSerializer, TrainingRunListSerializer, TrainedModelSerializer,
+)
 from .tasks_simple import generate_synthetic_dataset, train_model
 
+# Content types for the dataset file formats written by the generator
+DOWNLOAD_CONTENT_TYPES = {
+    '.jsonl': 'application/x-ndjson',
+    '.jsonl.gz': 'application/gzip',
+}
+
+# Dataset files never change once written, so clients may reuse them for an hour
+DOWNLOAD_CACHE_CONTROL = 'private, max-age=3600'
+
+
+def _xaccel_path(file_path: str):
+    """Internal nginx URI for a file under DATA_DIR, or None when X-Accel is off or it lies outside"""
+    prefix = settings.DATASET_XACCEL_PREFIX
+    if not prefix:
+        return None
+    try:
+        relative = Path(file_path).resolve().relative_to(Path(settings.DATA_DIR).resolve())
+    except ValueError:
+        return None
+    return prefix.rstrip('/') + '/' + quote(relative.as_posix())
+
+
+def _etag_matches(if_none_match, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags
+
 
 class SyntheticDatasetViewSet(viewsets.ModelViewSet):
     serializer_class = SyntheticDatasetSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return SyntheticDataset.objects.filter(created_by=self.request.user)
+        queryset = SyntheticDataset.objects.filter(created_by=self.request.user)
+        if self.action == 'list':
+            # Skip loading generation_config for rows the list serializer won't show
+            queryset = queryset.only(*SyntheticDatasetListSerializer.Meta.fields)
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return SyntheticDatasetListSerializer
+        return super().get_serializer_class()
     
     @action(detail=True, methods=['post'])
     def generate(self, request, pk=None):
@@ -47,17 +91,52 @@ class SyntheticDatasetViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        if not dataset.file_path or not os.path.exists(dataset.file_path):
+        # A recorded size means the task wrote the file; only older rows need the stat
+        missing = not dataset.file_path or (
+            dataset.file_size_bytes is None and not os.path.exists(dataset.file_path)
+        )
+        if missing:
             return Response(
                 {'error': 'Dataset file not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        etag = f'"{dataset.content_hash}"' if dataset.content_hash else None
+        if etag and _etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            response['Cache-Control'] = DOWNLOAD_CACHE_CONTROL
+            return response
+        
         try:
-            with open(dataset.file_path, 'rb') as f:
-                response = HttpResponse(f.read(), content_type='application/json')
-                response['Content-Disposition'] = f'attachment; filename="{dataset.name}.json"'
-                return response
+            suffix = ''.join(Path(dataset.file_path).suffixes) or '.json'
+            content_type = DOWNLOAD_CONTENT_TYPES.get(suffix, 'application/json')
+            filename = f"{dataset.name}{suffix}"
+            
+            internal_path = _xaccel_path(dataset.file_path)
+            if internal_path:
+                # nginx serves the bytes; Django only sends the headers
+                response = HttpResponse(content_type=content_type)
+                response['Content-Disposition'] = content_disposition_header(True, filename)
+                response['X-Accel-Redirect'] = internal_path
+            else:
+                # FileResponse streams the file (sendfile where the server supports it)
+                response = FileResponse(
+                    open(dataset.file_path, 'rb'),
+                    as_attachment=True,
+                    filename=filename,
+                    content_type=content_type,
+                )
+            
+            if etag:
+                response['ETag'] = etag
+                response['Cache-Control'] = DOWNLOAD_CACHE_CONTROL
+            return response
+        except FileNotFoundError:
+            return Response(
+                {'error': 'Dataset file not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         except Exception as e:
             return Response(
                 {'error': f'Failed to download dataset: {str(e)}'},
@@ -84,7 +163,6 @@ class SyntheticDatasetViewSet(viewsets.ModelViewSet):
             name=name,
             dataset=dataset,
             training_config=training_config,
-            output_dir=f'./models/{name.lower().replace(" ", "_")}',
             created_by=request.user,
             status='pending'
         )
@@ -98,7 +176,18 @@ class TrainingRunViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return TrainingRun.objects.filter(created_by=self.request.user)
+        queryset = TrainingRun.objects.filter(created_by=self.request.user)
+        if self.action == 'list':
+            # duration is computed, so defer the omitted columns rather than listing the loaded ones
+            queryset = queryset.defer('training_config', 'logs')
+        else:
+            queryset = queryset.select_related('dataset')
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return TrainingRunListSerializer
+        return super().get_serializer_class()
     
     @action(detail=True, methods=['post'])
     def start(self, request, pk=None):
@@ -146,6 +235,6 @@ class TrainedModelViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return TrainedModel.objects.filter(
+        return TrainedModel.objects.select_related('training_run').filter(
             training_run__created_by=self.request.user
         )
@@ -7,6 +7,15 @@ import { Button } from '../components/ui/Button'
 import { Badge } from '../components/ui/Badge'
 import { Play, Send, Copy, CheckCircle, XCircle, Clock, Lightbulb } from 'lucide-react'
 
+// Generated calls arrive as compact JSON; indent them for display
+const formatOutput = (output: string) => {
+  try {
+    return JSON.stringify(JSON.parse(output), null, 2)
+  } catch {
+    return output
+  }
+}
+
 export default function Playground() {
   const [inputText, setInputText] = useState('')
   const [selectedModel, setSelectedModel] = useState<number | null>(null)
@@ -176,13 +185,13 @@ export default function Playground() {
                           <Button
                             variant="ghost"
                             size="sm"
-                            onClick={() => copyToClipboard(item.generated_output)}
+                            onClick={() => copyToClipboard(formatOutput(item.generated_output))}
                           >
                             <Copy className="h-3 w-3" />
                           </Button>
                         </div>
                         <pre className="text-xs bg-muted p-3 rounded overflow-x-auto">
-                          {item.generated_output}
+                          {formatOutput(item.generated_output)}
                         </pre>
                       </div>
                     </div>
@@ -92,8 +92,9 @@ export default function Specs() {
     }
   }
 
-  const handleViewDetails = (spec: any) => {
-    setSelectedSpec(spec)
+  const handleViewDetails = async (spec: any) => {
+    // The list endpoint omits spec_content, so load the full spec for the dialog
+    setSelectedSpec(await apiClient.getSpec(spec.id))
     setShowDetailsDialog(true)
   }
 
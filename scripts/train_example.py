@@ -3,10 +3,12 @@
 Example training script for SmolLM2 Task→API Mapper
 """
 
+import hashlib
 import json
 import os
 import sys
 from pathlib import Path
+from types import MappingProxyType
 
 # Add backend to path
 sys.path.append(str(Path(__file__).parent.parent / "backend"))
@@ -19,109 +21,145 @@ django.setup()
 from training.data_generation.synthetic_generator import SyntheticDataGenerator
 from training.pipeline.smollm_trainer import SmolLMTrainer, TrainingConfig
 
+try:
+    import orjson
 
-def create_example_openapi_spec():
-    """Create a simple example OpenAPI spec"""
-    return {
-        "openapi": "3.0.0",
-        "info": {
-            "title": "Pet Store API",
-            "version": "1.0.0"
-        },
-        "servers": [
-            {"url": "https://petstore.example.com/api/v1"}
-        ],
-        "paths": {
-            "/pets": {
-                "get": {
-                    "summary": "List all pets",
-                    "parameters": [
-                        {
-                            "name": "limit",
-                            "in": "query",
-                            "schema": {"type": "integer", "maximum": 100}
-                        },
-                        {
-                            "name": "status",
-                            "in": "query",
-                            "schema": {"type": "string", "enum": ["available", "pending", "sold"]}
-                        }
-                    ],
-                    "responses": {"200": {"description": "A list of pets"}}
-                },
-                "post": {
-                    "summary": "Create a pet",
-                    "requestBody": {
-                        "content": {
-                            "application/json": {
-                                "schema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "name": {"type": "string"},
-                                        "status": {"type": "string"},
-                                        "category": {"type": "string"}
-                                    },
-                                    "required": ["name"]
-                                }
-                            }
-                        }
+    def _canonical_json(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    def _canonical_json(obj) -> bytes:
+        return json.dumps(obj, sort_keys=True, separators=(',', ':')).encode()
+
+
+# Prompts used to spot-check the trained model
+TEST_PROMPTS = (
+    "Get all pets with status available",
+    "Create a new pet named Fluffy",
+    "Get pet with ID 123",
+    "Update pet 456 with status sold",
+    "Delete pet 789",
+)
+
+# Samples generated for each split of the example dataset
+TRAIN_SAMPLES = 1000
+VAL_SAMPLES = 200
+
+# Lets SyntheticDataGenerator reuse the parsed example spec across instances
+EXAMPLE_SPEC_CACHE_KEY = "example-petstore-v1"
+
+
+# Example spec, built once at import; the read-only view is shared by every caller
+_EXAMPLE_SPEC = MappingProxyType({
+    "openapi": "3.0.0",
+    "info": {
+        "title": "Pet Store API",
+        "version": "1.0.0"
+    },
+    "servers": [
+        {"url": "https://petstore.example.com/api/v1"}
+    ],
+    "paths": {
+        "/pets": {
+            "get": {
+                "summary": "List all pets",
+                "parameters": [
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "schema": {"type": "integer", "maximum": 100}
                     },
-                    "responses": {"201": {"description": "Pet created"}}
-                }
+                    {
+                        "name": "status",
+                        "in": "query",
+                        "schema": {"type": "string", "enum": ["available", "pending", "sold"]}
+                    }
+                ],
+                "responses": {"200": {"description": "A list of pets"}}
             },
-            "/pets/{petId}": {
-                "get": {
-                    "summary": "Get a pet by ID",
-                    "parameters": [
-                        {
-                            "name": "petId",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "integer"}
+            "post": {
+                "summary": "Create a pet",
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {"type": "string"},
+                                    "status": {"type": "string"},
+                                    "category": {"type": "string"}
+                                },
+                                "required": ["name"]
+                            }
                         }
-                    ],
-                    "responses": {"200": {"description": "Pet details"}}
+                    }
                 },
-                "put": {
-                    "summary": "Update a pet",
-                    "parameters": [
-                        {
-                            "name": "petId",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "integer"}
-                        }
-                    ],
-                    "requestBody": {
-                        "content": {
-                            "application/json": {
-                                "schema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "name": {"type": "string"},
-                                        "status": {"type": "string"}
-                                    }
+                "responses": {"201": {"description": "Pet created"}}
+            }
+        },
+        "/pets/{petId}": {
+            "get": {
+                "summary": "Get a pet by ID",
+                "parameters": [
+                    {
+                        "name": "petId",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"}
+                    }
+                ],
+                "responses": {"200": {"description": "Pet details"}}
+            },
+            "put": {
+                "summary": "Update a pet",
+                "parameters": [
+                    {
+                        "name": "petId",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"}
+                    }
+                ],
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {"type": "string"},
+                                    "status": {"type": "string"}
                                 }
                             }
                         }
-                    },
-                    "responses": {"200": {"description": "Pet updated"}}
+                    }
                 },
-                "delete": {
-                    "summary": "Delete a pet",
-                    "parameters": [
-                        {
-                            "name": "petId",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "integer"}
-                        }
-                    ],
-                    "responses": {"204": {"description": "Pet deleted"}}
-                }
+                "responses": {"200": {"description": "Pet updated"}}
+            },
+            "delete": {
+                "summary": "Delete a pet",
+                "parameters": [
+                    {
+                        "name": "petId",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"}
+                    }
+                ],
+                "responses": {"204": {"description": "Pet deleted"}}
             }
         }
     }
+})
+
+
+def create_example_openapi_spec():
+    """Return the simple example OpenAPI spec (read-only)"""
+    return _EXAMPLE_SPEC
+
+
+def dataset_cache_key(spec) -> str:
+    """Content hash naming the generated dataset files, so an unchanged spec reuses them"""
+    payload = _canonical_json({"spec": dict(spec), "train": TRAIN_SAMPLES, "val": VAL_SAMPLES})
+    return hashlib.sha256(payload).hexdigest()[:16]
 
 
 def main():
@@ -137,20 +175,25 @@ def main():
     print("\n📊 Step 1: Generating synthetic training data...")
     
     spec = create_example_openapi_spec()
-    generator = SyntheticDataGenerator(spec)
-    
-    # Generate training and validation datasets
-    train_samples = generator.generate_synthetic_data(1000)
-    val_samples = generator.generate_synthetic_data(200)
-    
-    train_path = data_dir / "train_dataset.json"
-    val_path = data_dir / "val_dataset.json"
+    key = dataset_cache_key(spec)
     
-    generator.save_dataset(train_samples, str(train_path))
-    generator.save_dataset(val_samples, str(val_path))
+    train_path = data_dir / f"train_{key}.jsonl"
+    val_path = data_dir / f"val_{key}.jsonl"
     
-    print(f"✅ Generated {len(train_samples)} training samples")
-    print(f"✅ Generated {len(val_samples)} validation samples")
+    if train_path.exists() and val_path.exists():
+        print(f"✅ Reusing cached datasets for spec {key}")
+    else:
+        generator = SyntheticDataGenerator(spec, cache_key=EXAMPLE_SPEC_CACHE_KEY)
+        
+        # Generate training and validation datasets
+        train_samples = generator.generate_synthetic_data(TRAIN_SAMPLES)
+        val_samples = generator.generate_synthetic_data(VAL_SAMPLES)
+        
+        generator.save_dataset_jsonl(train_samples, str(train_path))
+        generator.save_dataset_jsonl(val_samples, str(val_path))
+        
+        print(f"✅ Generated {len(train_samples)} training samples")
+        print(f"✅ Generated {len(val_samples)} validation samples")
     
     # Step 2: Configure training
     print("\n🧠 Step 2: Configuring SmolLM2 training...")
@@ -189,15 +232,7 @@ def main():
         # Step 4: Test the model
         print("\n🧪 Step 4: Testing the trained model...")
         
-        test_prompts = [
-            "Get all pets with status available",
-            "Create a new pet named Fluffy",
-            "Get pet with ID 123",
-            "Update pet 456 with status sold",
-            "Delete pet 789"
-        ]
-        
-        for prompt in test_prompts:
+        for prompt in TEST_PROMPTS:
             response = trainer.generate_response(prompt, max_length=256)
             print(f"\n📝 Input: {prompt}")
             print(f"🤖 Output: {response}")